@@ -3,6 +3,11 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (for example
+``gunicorn -k uvicorn.workers.UvicornWorker backend.asgi:application``) for
+the dashboard's live updates and the concurrent analytics page; under WSGI the
+dashboard does not update itself.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Account, Transaction, AccountEntry
+from .models import Account, Transaction, AccountEntry, AccountStats, NetWorthSnapshot, TransactionRollup, ExchangeRate, Job
 
 
 @admin.register(Account)
@@ -63,3 +63,42 @@ class AccountEntryAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(NetWorthSnapshot)
+class NetWorthSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['user', 'month', 'year', 'total_assets', 'total_liabilities', 'net_worth', 'updated_at']
+    list_filter = ['year', 'month']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(TransactionRollup)
+class TransactionRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'tier', 'month', 'year', 'transaction_type', 'category', 'total', 'count']
+    list_filter = ['tier', 'transaction_type', 'year']
+    search_fields = ['user__username', 'user__email']
+
+
+@admin.register(AccountStats)
+class AccountStatsAdmin(admin.ModelAdmin):
+    list_display = ['account', 'latest_balance', 'growth_1m', 'growth_12m', 'volatility', 'updated_at']
+    search_fields = ['account__name', 'account__user__username']
+    raw_id_fields = ['account']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ['currency', 'date', 'rate', 'source', 'updated_at']
+    list_filter = ['currency', 'source']
+    date_hierarchy = 'date'
+    readonly_fields = ['updated_at']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'user', 'status', 'progress', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status', 'created_at']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'updated_at']
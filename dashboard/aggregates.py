@@ -0,0 +1,21 @@
+from decimal import Decimal
+
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+# Result field name -> Transaction.transaction_type
+TRANSACTION_TOTALS = {
+    'income': 'income',
+    'expenses': 'expense',
+    'transfers': 'transfer',
+}
+
+
+def sum_by_type(transaction_type, field='amount'):
+    """Exact Decimal sum of one transaction type, zero when there are none"""
+    return Coalesce(
+        Sum(field, filter=Q(transaction_type=transaction_type)),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=15, decimal_places=2),
+    )
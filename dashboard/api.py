@@ -0,0 +1,141 @@
+import functools
+import hashlib
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import views
+from .balances import with_latest_balance
+from .cache import get_data_version
+from .entries import close_month
+from .forms import AnalyticsRangeForm, TransactionFilterForm
+from .models import Account, Job, Transaction
+from .pagination import InvalidCursor, KeysetPaginator
+from .portfolio import Portfolio
+from .routers import use_replica
+from .serializers import (
+    AccountEntrySerializer, AccountSerializer, JobSerializer, MonthCloseSerializer, TransactionSerializer,
+)
+
+
+def user_data_etag(request, version):
+    """Weak ETag for a URL as seen by a user at a data version"""
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'W/"{request.user.pk}-{version}-{digest}"'
+
+
+def conditional_on_user_data(view):
+    """Answer 304 Not Modified when the client's ETag matches the user's data version.
+    
+    Apply below ``@api_view`` so the request is already authenticated. On a
+    match the wrapped view never runs, so no payload is built. Otherwise the
+    version is left on ``request.data_version`` for the view's Portfolio.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.data_version = get_data_version(request.user.pk)
+        etag = user_data_etag(request, request.data_version)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view(request, *args, **kwargs)
+        
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    return wrapper
+
+
+def paginated_response(request, queryset, keys, serializer_class, per_page=100):
+    """Serialize one keyset page along with links to its neighbours"""
+    try:
+        page = KeysetPaginator(queryset, keys, per_page=per_page).page(
+            after=request.query_params.get('after'), before=request.query_params.get('before')
+        )
+    except InvalidCursor as exc:
+        raise Http404(str(exc))
+    
+    query = views.query_without(request, 'after', 'before')
+    base = request.build_absolute_uri(request.path) + '?' + (query + '&' if query else '')
+    
+    return Response({
+        'next': f'{base}after={page.next_cursor}' if page.has_next else None,
+        'previous': f'{base}before={page.previous_cursor}' if page.has_previous else None,
+        'results': serializer_class(page.object_list, many=True).data,
+    })
+
+
+@api_view(['GET'])
+@conditional_on_user_data
+def account_list(request):
+    accounts = with_latest_balance(Account.objects.filter(user=request.user))
+    return Response(AccountSerializer(accounts, many=True).data)
+
+
+@api_view(['GET'])
+@conditional_on_user_data
+def account_entries(request, account_id):
+    account = get_object_or_404(Account, id=account_id, user=request.user)
+    return paginated_response(request, account.entries.all(), ('year', 'month'), AccountEntrySerializer)
+
+
+@api_view(['GET'])
+@conditional_on_user_data
+def transaction_list(request):
+    transactions = Transaction.objects.filter(user=request.user)
+    
+    form = TransactionFilterForm(request.user, request.query_params)
+    if not form.is_valid():
+        raise ValidationError(form.errors)
+    
+    return paginated_response(request, form.filter(transactions), views.TRANSACTION_PAGE_KEYS, TransactionSerializer)
+
+
+@api_view(['POST'])
+def month_close(request):
+    serializer = MonthCloseSerializer(data=request.data, context={'user': request.user})
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    saved = close_month(request.user, data['year'], data['month'], data['balances'])
+    return Response({'year': data['year'], 'month': data['month'], 'saved': saved})
+
+
+@use_replica
+@api_view(['GET'])
+@conditional_on_user_data
+def analytics_series(request, series):
+    if series not in views.ANALYTICS_SERIES:
+        raise Http404('Unknown analytics series')
+    helper, default_months = views.ANALYTICS_SERIES[series]
+    portfolio = Portfolio(request.user, request.data_version)
+    if default_months is None:
+        return Response(helper(portfolio))
+    
+    form = AnalyticsRangeForm(request.query_params, default_months=default_months, user=request.user)
+    if not form.is_valid():
+        raise ValidationError(form.errors)
+    if series in views.GRANULAR_SERIES:
+        return Response(helper(portfolio, *form.date_range(), form.get_granularity()))
+    return Response(helper(portfolio, *form.date_range()))
+
+
+# Jobs change independently of the user's data version, so these skip the ETag check
+@api_view(['GET'])
+def job_list(request):
+    jobs = Job.objects.filter(user=request.user)[:20]
+    return Response(JobSerializer(jobs, many=True).data)
+
+
+@api_view(['GET'])
+def job_status(request, job_id):
+    job = get_object_or_404(Job, id=job_id, user=request.user)
+    response = Response(JobSerializer(job).data)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
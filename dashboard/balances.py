@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.db.models import DecimalField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .fx import base_currency, convert_current
+from .models import Account, AccountEntry
+
+
+LIABILITY_ACCOUNT_TYPES = ('loan', 'credit')
+LIQUID_ACCOUNT_TYPES = ('checking', 'savings')
+
+
+def with_latest_balance(accounts):
+    """Annotate an account queryset with the balance of each account's most recent entry"""
+    latest_entry = AccountEntry.objects.filter(
+        account=OuterRef('pk')
+    ).order_by('-year', '-month').values('balance')[:1]
+    
+    return accounts.annotate(
+        latest_balance=Coalesce(
+            Subquery(latest_entry),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=15, decimal_places=2),
+        )
+    )
+
+
+class BalanceSnapshot:
+    """Current balances and net worth totals for a user's active accounts.
+    
+    All latest balances are resolved in a single query, and assets, liabilities,
+    liquid assets and allocation are computed in one pass over the result.
+    Totals are in ``currency``; each account also gets a ``converted_balance``.
+    """
+    
+    def __init__(self, accounts, currency):
+        self.accounts = convert_current(list(accounts), currency)
+        self.currency = currency
+        self.total_assets = Decimal('0.00')
+        self.total_liabilities = Decimal('0.00')
+        self.liquid_assets = Decimal('0.00')
+        self.allocation = {}
+        
+        for account in self.accounts:
+            balance = account.converted_balance
+            if account.account_type in LIABILITY_ACCOUNT_TYPES:
+                self.total_liabilities += abs(balance)
+            else:
+                self.total_assets += balance
+                if account.account_type in LIQUID_ACCOUNT_TYPES:
+                    self.liquid_assets += balance
+                if balance > 0:
+                    self.allocation[account.asset_type] = self.allocation.get(account.asset_type, Decimal('0.00')) + balance
+        
+        self.net_worth = self.total_assets - self.total_liabilities
+    
+    @classmethod
+    def for_user(cls, user):
+        """Build a snapshot of the user's active accounts"""
+        return cls(with_latest_balance(Account.objects.filter(user=user, is_active=True)), base_currency(user.pk))
+    
+    @property
+    def asset_diversity(self):
+        """Number of distinct asset types holding a positive balance"""
+        return len(set(account.asset_type for account in self.accounts if account.latest_balance > 0))
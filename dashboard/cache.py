@@ -0,0 +1,73 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import VersionStamp
+
+
+def get_version(key):
+    """Current stamp stored under a VersionStamp key"""
+    version = VersionStamp.objects.filter(key=key).values_list('version', flat=True).first()
+    if version is None:
+        # A fresh stamp can never match keys cached under one that was lost
+        version = VersionStamp.objects.get_or_create(key=key, defaults={'version': time.time_ns()})[0].version
+    return version
+
+
+def bump_version(key):
+    """Replace the stamp under a VersionStamp key, within the caller's transaction"""
+    stamp = time.time_ns()
+    if not VersionStamp.objects.filter(key=key).update(version=stamp, updated_at=timezone.now()):
+        VersionStamp.objects.update_or_create(key=key, defaults={'version': stamp})
+
+
+def version_key(user_id):
+    return f'data:{user_id}'
+
+
+def get_data_version(user_id):
+    """Current version stamp of a user's financial data"""
+    return get_version(version_key(user_id))
+
+
+def bump_data_version(user_id):
+    """Invalidate every cached analytics result, fragment and ETag for a user"""
+    bump_version(version_key(user_id))
+
+
+RATES_VERSION_KEY = 'rates'
+
+
+def get_rates_version():
+    """Version stamp of the exchange rate table, shared by every process"""
+    return get_version(RATES_VERSION_KEY)
+
+
+def bump_rates_version():
+    """Discard every process's in-memory exchange rate tables"""
+    bump_version(RATES_VERSION_KEY)
+
+
+def cached_analytics(func):
+    """Cache an analytics helper's result per user and data version.
+    
+    The helper's first argument must be the user's Portfolio; the remaining
+    arguments become part of the cache key.
+    """
+    @functools.wraps(func)
+    def wrapper(portfolio, *args, **kwargs):
+        user_id = portfolio.user.pk
+        arguments = hashlib.md5(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+        key = f'dashboard:{func.__name__}:{user_id}:{portfolio.data_version}:{arguments}'
+        
+        result = cache.get(key)
+        if result is None:
+            result = func(portfolio, *args, **kwargs)
+            cache.set(key, result, settings.ANALYTICS_CACHE_TIMEOUT)
+        return result
+    
+    return wrapper
@@ -0,0 +1,28 @@
+import colorsys
+
+from .models import Transaction
+
+
+# The original chart colors, used first so existing charts keep their look
+PALETTE = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#C9CBCF', '#8BC34A']
+
+# Fraction of the color wheel between generated hues; the golden angle keeps
+# every new hue far from the ones before it
+GOLDEN_ANGLE = 0.381966
+
+# Grey for "everything else" slices, outside the palette and generated hues
+OTHER_COLOR = '#B0B7C3'
+
+
+def chart_color(index):
+    """A distinct hex color for the index-th item of a chart, never repeating"""
+    if index < len(PALETTE):
+        return PALETTE[index]
+    hue = (index - len(PALETTE)) * GOLDEN_ANGLE % 1
+    # Alternate lightness so neighbouring hues also differ in brightness
+    lightness = 0.55 if index % 2 else 0.45
+    return '#{:02X}{:02X}{:02X}'.format(*(round(channel * 255) for channel in colorsys.hls_to_rgb(hue, lightness, 0.65)))
+
+
+# Each category keeps its color across charts and ranges
+CATEGORY_COLORS = {category: chart_color(index) for index, (category, label) in enumerate(Transaction.CATEGORIES)}
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .performance import current_metrics, instrument_connections
+
+
+logger = logging.getLogger(__name__)
+
+_SKIPPED = object()
+
+
+def call_in_worker(func, *args):
+    """Run func on a pool thread, counting its queries towards the current request"""
+    try:
+        with instrument_connections(current_metrics.get()):
+            return func(*args)
+    finally:
+        # Pool threads outlive the request, so release their connections like a request would
+        close_old_connections()
+
+
+async def gather_with_timeouts(calls, timeout):
+    """Run blocking calls concurrently on pool threads, giving each ``timeout`` seconds.
+    
+    ``calls`` maps names to ``(func, args)``. Returns the results of the calls
+    that finished in time and the names of those that timed out or raised.
+    A timed-out call keeps its thread until it returns; only its result is
+    dropped.
+    """
+    async def run(name, func, args):
+        worker = sync_to_async(call_in_worker, thread_sensitive=False)
+        try:
+            return await asyncio.wait_for(worker(func, *args), timeout)
+        except asyncio.TimeoutError:
+            logger.warning('%s took longer than %ss and was skipped', name, timeout)
+        except Exception:
+            logger.exception('%s failed and was skipped', name)
+        return _SKIPPED
+    
+    outcomes = await asyncio.gather(*(run(name, func, args) for name, (func, args) in calls.items()))
+    
+    results = {}
+    failed = []
+    for name, outcome in zip(calls, outcomes):
+        if outcome is _SKIPPED:
+            failed.append(name)
+        else:
+            results[name] = outcome
+    return results, failed
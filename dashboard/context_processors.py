@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_data_version
+
+
+def fragment_cache(request):
+    """Timeout and version stamp for ``{% cache %}`` fragments of a user's data.
+    
+    Fragments keyed on ``data_version`` go stale the moment the user's data
+    changes, so they never need deleting. The stamp is only looked up when a
+    template uses it.
+    """
+    return {
+        'fragment_cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+        'data_version': SimpleLazyObject(lambda: get_data_version(request.user.pk)),
+    }
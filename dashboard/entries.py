@@ -0,0 +1,33 @@
+from django.db import transaction
+
+from .cache import bump_data_version
+from .events import publish_changes
+from .models import AccountEntry
+from .snapshots import refresh_months_since
+from .stats import refresh_account_stats
+
+
+def close_month(user, year, month, balances):
+    """Upsert one month's balances for several of a user's accounts at once.
+    
+    ``balances`` maps account ids (already checked to belong to the user) to
+    balances. The entries are written in one statement, and snapshots, account
+    stats and cached analytics are refreshed once for the whole batch rather
+    than once per entry as the signals would.
+    """
+    entries = [
+        AccountEntry(account_id=account_id, year=year, month=month, balance=balance)
+        for account_id, balance in balances.items()
+    ]
+    with transaction.atomic():
+        AccountEntry.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['account', 'month', 'year'],
+            update_fields=['balance', 'updated_at'],
+        )
+        refresh_months_since(user.pk, year, month)
+        refresh_account_stats(balances)
+    bump_data_version(user.pk)
+    publish_changes(user.pk, account_ids=balances)
+    return len(entries)
@@ -0,0 +1,197 @@
+import asyncio
+import functools
+import json
+import logging
+import threading
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.utils.dateformat import format as format_date
+
+from .balances import BalanceSnapshot
+from .fx import base_currency
+from .models import Account, Transaction
+from .portfolio import account_records
+from .routers import primary_reads
+
+
+logger = logging.getLogger('dashboard.events')
+
+# The dashboard lists this many recent transactions, so no update carries more
+RECENT_TRANSACTIONS = 10
+
+
+def channel_name(user_id):
+    return f'dashboard:live:{user_id}'
+
+
+class LocalBroker:
+    """In-process fan-out for development and tests; only reaches streams served by this process"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Channel -> set of (event loop, queue) per open stream
+        self.subscribers = {}
+    
+    def has_subscribers(self, channel):
+        return bool(self.subscribers.get(channel))
+    
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # The stream's event loop has already closed
+                pass
+    
+    async def listen(self, channel, timeout):
+        """Yield None once subscribed, then each message published to a channel, or None after ``timeout`` idle seconds"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.lock:
+            self.subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield None
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self.lock:
+                self.subscribers[channel].discard(subscriber)
+                if not self.subscribers[channel]:
+                    del self.subscribers[channel]
+
+
+class RedisBroker:
+    """Fan-out through Redis pub/sub, reaching streams in every process"""
+    
+    def __init__(self, url):
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+    
+    def has_subscribers(self, channel):
+        return self.client.pubsub_numsub(channel)[0][1] > 0
+    
+    def publish(self, channel, message):
+        self.client.publish(channel, message)
+    
+    async def listen(self, channel, timeout):
+        """Yield None once subscribed, then each message published to a channel, or None after ``timeout`` idle seconds"""
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield None
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+                yield message['data'].decode() if message else None
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+@functools.lru_cache(maxsize=None)
+def get_broker():
+    if settings.LIVE_UPDATES_BROKER == 'redis':
+        return RedisBroker(settings.REDIS_URL)
+    return LocalBroker()
+
+
+def serialize_transaction(transaction):
+    return {
+        'id': transaction.pk,
+        'date': transaction.date.isoformat(),
+        'date_display': format_date(transaction.date, 'M d, Y'),
+        'account': transaction.account.name,
+        'description': transaction.description,
+        'transaction_type': transaction.get_transaction_type_display(),
+        'type_color': transaction.type_color,
+        'amount': float(transaction.amount),
+    }
+
+
+def build_update(user_id, account_ids, transaction_ids, recent_transactions):
+    """The parts of a user's dashboard that changed, as a JSON-ready dict"""
+    update = {}
+    if account_ids:
+        snapshot = BalanceSnapshot(
+            account_records(Account.objects.filter(user_id=user_id, is_active=True)), base_currency(user_id)
+        )
+        balances = {account.id: account for account in snapshot.accounts}
+        update.update({
+            'currency': snapshot.currency,
+            'net_worth': float(snapshot.net_worth),
+            'total_assets': float(snapshot.total_assets),
+            'total_liabilities': float(snapshot.total_liabilities),
+            # Accounts that were deleted or deactivated drop off the chart with a zero balance
+            'accounts': [
+                {
+                    'id': account_id,
+                    'name': balances[account_id].name if account_id in balances else None,
+                    'balance': float(balances[account_id].converted_balance) if account_id in balances else 0.0,
+                }
+                for account_id in sorted(account_ids)
+            ],
+        })
+    
+    if transaction_ids or recent_transactions:
+        transactions = Transaction.objects.filter(user_id=user_id).select_related('account').order_by('-date', '-created_at')
+        if not recent_transactions:
+            transactions = transactions.filter(pk__in=transaction_ids)
+        update['transactions'] = [serialize_transaction(transaction) for transaction in transactions[:RECENT_TRANSACTIONS]]
+    return update
+
+
+def send_update(user_id, account_ids, transaction_ids, recent_transactions):
+    broker = get_broker()
+    channel = channel_name(user_id)
+    try:
+        # Skip the queries when none of the user's dashboards are open
+        if not broker.has_subscribers(channel):
+            return
+        # Read what was just committed, not a replica that may lag behind
+        with primary_reads():
+            update = build_update(user_id, account_ids, transaction_ids, recent_transactions)
+        broker.publish(channel, json.dumps(update))
+    except redis.RedisError:
+        # Live updates are best effort; the write itself has already succeeded
+        logger.warning('Could not publish a live update for user %s', user_id, exc_info=True)
+
+
+def publish_changes(user_id, account_ids=(), transaction_ids=(), recent_transactions=False):
+    """Push the changes to the user's open dashboards once the current transaction commits.
+    
+    ``account_ids`` are accounts whose balance changed; the update carries
+    their new balances and the new totals. ``transaction_ids`` are saved
+    transactions to show, or pass ``recent_transactions`` after bulk writes
+    to send the latest RECENT_TRANSACTIONS instead.
+    """
+    db_transaction.on_commit(functools.partial(
+        send_update, user_id, set(account_ids), set(transaction_ids), recent_transactions
+    ))
+
+
+async def event_stream(user_id):
+    """Server-sent event frames for a user's updates, with a comment on idle connections.
+    
+    The stream ends after LIVE_UPDATES_MAX_SECONDS, and the browser's
+    EventSource reconnects, so a stream whose client vanished is not held
+    open forever.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.LIVE_UPDATES_MAX_SECONDS
+    yield 'retry: 3000\n\n'
+    
+    listener = get_broker().listen(channel_name(user_id), settings.LIVE_UPDATES_HEARTBEAT)
+    try:
+        async for message in listener:
+            yield ': keep-alive\n\n' if message is None else f'event: update\ndata: {message}\n\n'
+            if loop.time() >= deadline:
+                break
+    finally:
+        await listener.aclose()
@@ -0,0 +1,286 @@
+import csv
+import io
+import tempfile
+from itertools import islice
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from .forms import TransactionFilterForm
+from .models import AccountEntry, NetWorthSnapshot, Transaction
+
+
+# Rows fetched per database round trip; the only rows held in memory at once
+EXPORT_CHUNK_SIZE = 2000
+
+# CSV rows joined into each chunk handed to the WSGI server
+CSV_ROWS_PER_CHUNK = 500
+
+PDF_ROWS_PER_PAGE = 40
+
+# Leading characters that make spreadsheet apps read a text cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# reportlab keeps every page in memory until the document is saved, so PDF
+# reports stop here; CSV and Excel carry the full history
+PDF_MAX_ROWS = 10000
+
+PDF_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e9ecef')),
+    ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+    ('ALIGN', (-1, 0), (-1, -1), 'RIGHT'),
+])
+
+
+class ExportDataset:
+    """Column headings plus a lazily evaluated source of row tuples"""
+    
+    def __init__(self, name, title, headers, queryset, format_row=tuple, pdf_widths=None):
+        self.name = name
+        self.title = title
+        self.headers = headers
+        self.queryset = queryset
+        self.format_row = format_row
+        self.pdf_widths = pdf_widths
+        # Optional callback given the number of rows written after each chunk
+        self.progress = None
+    
+    def rows(self):
+        """Yield formatted rows, reading the queryset in chunks"""
+        for count, row in enumerate(self.queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE), start=1):
+            yield self.format_row(row)
+            if self.progress is not None and count % EXPORT_CHUNK_SIZE == 0:
+                self.progress(count)
+
+
+def transaction_dataset(user, params):
+    """The user's transactions, narrowed by the same filters as the transactions list"""
+    transactions = Transaction.objects.filter(user=user)
+    form = TransactionFilterForm(user, params or None)
+    if form.is_valid():
+        transactions = form.filter(transactions)
+    
+    type_labels = dict(Transaction.TRANSACTION_TYPES)
+    category_labels = dict(Transaction.CATEGORIES)
+    
+    def format_row(row):
+        date, account, transaction_type, category, description, amount = row
+        return date, account, type_labels.get(transaction_type, transaction_type), category_labels.get(category, category), description, amount
+    
+    return ExportDataset(
+        'transactions',
+        'Transactions',
+        ['Date', 'Account', 'Type', 'Category', 'Description', 'Amount'],
+        transactions.order_by('-date', '-created_at', '-id').values_list(
+            'date', 'account__name', 'transaction_type', 'category', 'description', 'amount'
+        ),
+        format_row,
+        pdf_widths=[0.9 * inch, 1.4 * inch, 0.8 * inch, 1.0 * inch, 2.5 * inch, 0.9 * inch],
+    )
+
+
+def entry_dataset(user, params):
+    """Monthly balance entries for all of the user's accounts, or just ?account=<id>"""
+    entries = AccountEntry.objects.filter(account__user=user)
+    account_id = params.get('account')
+    if account_id and account_id.isdigit():
+        entries = entries.filter(account_id=account_id)
+    
+    def format_row(row):
+        account, year, month, balance, notes = row
+        return account, f'{year:04d}-{month:02d}', balance, notes
+    
+    return ExportDataset(
+        'entries',
+        'Account Entries',
+        ['Account', 'Month', 'Balance', 'Notes'],
+        entries.order_by('account__name', 'account_id', '-year', '-month').values_list(
+            'account__name', 'year', 'month', 'balance', 'notes'
+        ),
+        format_row,
+        pdf_widths=[2.0 * inch, 0.9 * inch, 1.2 * inch, 3.4 * inch],
+    )
+
+
+def net_worth_dataset(user, params):
+    """The user's monthly net worth history from the snapshot table"""
+    def format_row(row):
+        year, month, total_assets, total_liabilities, net_worth = row
+        return f'{year:04d}-{month:02d}', total_assets, total_liabilities, net_worth
+    
+    return ExportDataset(
+        'net-worth',
+        'Net Worth History',
+        ['Month', 'Assets', 'Liabilities', 'Net Worth'],
+        NetWorthSnapshot.objects.filter(user=user).order_by('year', 'month').values_list(
+            'year', 'month', 'total_assets', 'total_liabilities', 'net_worth'
+        ),
+        format_row,
+    )
+
+
+DATASETS = {
+    'transactions': transaction_dataset,
+    'entries': entry_dataset,
+    'net-worth': net_worth_dataset,
+}
+
+
+def escape_formula(value):
+    """Quote text that a spreadsheet would otherwise evaluate, e.g. an imported '=HYPERLINK(...)' description"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def spreadsheet_rows(dataset):
+    """The dataset's rows with text cells made safe to open in a spreadsheet"""
+    for row in dataset.rows():
+        yield [escape_formula(value) for value in row]
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of storing it"""
+    
+    def write(self, value):
+        return value
+
+
+def stream_csv(dataset):
+    """Yield CSV text a few hundred rows at a time"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(dataset.headers)
+    
+    rows = spreadsheet_rows(dataset)
+    while True:
+        chunk = [writer.writerow(row) for row in islice(rows, CSV_ROWS_PER_CHUNK)]
+        if not chunk:
+            return
+        yield ''.join(chunk)
+
+
+def write_csv(dataset, output):
+    """Write the dataset as CSV to a binary file"""
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(dataset.headers)
+    writer.writerows(spreadsheet_rows(dataset))
+    text.flush()
+    text.detach()
+
+
+def write_excel(dataset, output):
+    """Write the dataset to an .xlsx file using openpyxl's write-only mode"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(dataset.title)
+    
+    header = []
+    for heading in dataset.headers:
+        cell = WriteOnlyCell(sheet, value=heading)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+    
+    for row in spreadsheet_rows(dataset):
+        sheet.append(row)
+    
+    workbook.save(output)
+
+
+def pdf_cell(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'quantize'):
+        return f'{value:,.2f}'
+    text = str(value)
+    return text if len(text) <= 60 else text[:57] + '...'
+
+
+def write_pdf(dataset, output):
+    """Draw the dataset as one table per page, building each page's table only when it is reached"""
+    width, height = letter
+    margin = 0.5 * inch
+    pdf = canvas.Canvas(output, pagesize=letter, pageCompression=1)
+    pdf.setTitle(dataset.title)
+    generated = timezone.now().strftime('%Y-%m-%d %H:%M')
+    
+    rows = dataset.rows()
+    page_number = 0
+    remaining = PDF_MAX_ROWS
+    while True:
+        chunk = [[pdf_cell(value) for value in row] for row in islice(rows, min(PDF_ROWS_PER_PAGE, remaining))]
+        if not chunk and page_number:
+            break
+        page_number += 1
+        remaining -= len(chunk)
+        
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.drawString(margin, height - margin, dataset.title)
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(width - margin, height - margin, f'Generated {generated}')
+        pdf.drawRightString(width - margin, margin / 2, f'Page {page_number}')
+        
+        table = Table([dataset.headers] + chunk, colWidths=dataset.pdf_widths)
+        table.setStyle(PDF_TABLE_STYLE)
+        table_width, table_height = table.wrapOn(pdf, width - 2 * margin, height - 2 * margin)
+        table.drawOn(pdf, margin, height - margin - 0.25 * inch - table_height)
+        
+        if not remaining and next(rows, None) is not None:
+            pdf.drawString(
+                margin, margin / 2,
+                f'Only the first {PDF_MAX_ROWS:,} rows are included; export CSV or Excel for the full history.',
+            )
+        pdf.showPage()
+        if not remaining:
+            break
+    
+    pdf.save()
+
+
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv', write_csv),
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', write_excel),
+    'pdf': ('pdf', 'application/pdf', write_pdf),
+}
+
+
+def export_filename(dataset, file_format):
+    return f'{dataset.name}-{timezone.now():%Y-%m-%d}.{EXPORT_FORMATS[file_format][0]}'
+
+
+def write_export(dataset, file_format, output):
+    """Write the dataset in the given format to a binary file"""
+    EXPORT_FORMATS[file_format][2](dataset, output)
+
+
+def export_response(dataset, file_format):
+    """Build a download response for a dataset without loading it all into memory.
+    
+    CSV streams straight from the database cursor. Excel and PDF are written
+    to a temporary file row by row (their formats need a finished file before
+    sending) and the file is then streamed back by FileResponse.
+    """
+    content_type = EXPORT_FORMATS[file_format][1]
+    filename = export_filename(dataset, file_format)
+    
+    if file_format == 'csv':
+        response = StreamingHttpResponse(stream_csv(dataset), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    output = tempfile.TemporaryFile()
+    write_export(dataset, file_format, output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=content_type)
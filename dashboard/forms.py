@@ -0,0 +1,199 @@
+from datetime import date
+
+from django import forms
+from django.utils import timezone
+
+from users.models import Profile
+
+from .fx import available_currencies
+from .models import Account, Transaction
+from .rollups import first_data_month
+from .timeseries import GRANULARITIES, align_range, calendar_range, month_range
+
+
+class TransactionFilterForm(forms.Form):
+    transaction_type = forms.ChoiceField(
+        choices=[('', 'All types')] + Transaction.TRANSACTION_TYPES,
+        required=False,
+    )
+    category = forms.ChoiceField(
+        choices=[('', 'All categories')] + Transaction.CATEGORIES,
+        required=False,
+    )
+    account = forms.ModelChoiceField(
+        queryset=Account.objects.none(),
+        required=False,
+        empty_label='All accounts',
+    )
+    start_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['account'].queryset = Account.objects.filter(user=user).order_by('name')
+        self.fields['account'].label_from_instance = lambda account: account.name
+        for field in self.fields.values():
+            field.widget.attrs['class'] = 'form-select form-select-sm' if isinstance(field, forms.ChoiceField) else 'form-control form-control-sm'
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise forms.ValidationError('The start date must be on or before the end date.')
+        return cleaned_data
+    
+    def filter(self, transactions):
+        """Apply the submitted filters to a transaction queryset"""
+        data = self.cleaned_data
+        if data.get('transaction_type'):
+            transactions = transactions.filter(transaction_type=data['transaction_type'])
+        if data.get('category'):
+            transactions = transactions.filter(category=data['category'])
+        if data.get('account'):
+            transactions = transactions.filter(account=data['account'])
+        if data.get('start_date'):
+            transactions = transactions.filter(date__gte=data['start_date'])
+        if data.get('end_date'):
+            transactions = transactions.filter(date__lte=data['end_date'])
+        return transactions
+
+
+class AnalyticsRangeForm(forms.Form):
+    """Date range and granularity for an analytics series.
+    
+    The range is the last ``months`` calendar months, explicit dates, or
+    ``all_time`` from the user's first data, widened to whole periods of the
+    chosen granularity.
+    """
+    
+    # Most periods a series may cover at any granularity
+    MAX_PERIODS = 120
+    
+    months = forms.IntegerField(required=False, min_value=1, max_value=MAX_PERIODS * GRANULARITIES['year'])
+    start_date = forms.DateField(required=False)
+    end_date = forms.DateField(required=False)
+    all_time = forms.BooleanField(required=False)
+    granularity = forms.ChoiceField(choices=[(name, name) for name in GRANULARITIES], required=False)
+    
+    def __init__(self, *args, default_months=6, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_months = default_months
+        self.user = user
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        
+        granularity = cleaned_data.get('granularity') or 'month'
+        end_date = cleaned_data.get('end_date') or timezone.now().date()
+        start_date = cleaned_data.get('start_date')
+        if cleaned_data.get('all_time'):
+            first = self.user and first_data_month(self.user.pk)
+            start_date = date(*first, 1) if first else end_date.replace(day=1)
+        elif start_date is None:
+            start_date, end_date = calendar_range(end_date, cleaned_data.get('months') or self.default_months)
+        
+        if start_date > end_date:
+            raise forms.ValidationError('The start date must be on or before the end date.')
+        start_date, end_date = align_range(start_date, end_date, granularity)
+        if len(month_range(start_date, end_date)) > self.MAX_PERIODS * GRANULARITIES[granularity]:
+            raise forms.ValidationError(
+                f'Ranges are limited to {self.MAX_PERIODS} periods; choose a coarser granularity.'
+            )
+        
+        cleaned_data['start_date'] = start_date
+        cleaned_data['end_date'] = end_date
+        cleaned_data['granularity'] = granularity
+        return cleaned_data
+    
+    def date_range(self):
+        """The validated (start_date, end_date), aligned to whole periods"""
+        return self.cleaned_data['start_date'], self.cleaned_data['end_date']
+    
+    def get_granularity(self):
+        return self.cleaned_data['granularity']
+
+
+class MonthCloseForm(forms.Form):
+    """One balance field per account for a single month; blank fields are left alone"""
+    
+    year = forms.IntegerField(min_value=1900, max_value=2100, widget=forms.HiddenInput)
+    month = forms.IntegerField(min_value=1, max_value=12, widget=forms.HiddenInput)
+    
+    def __init__(self, accounts, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accounts = accounts
+        for account in accounts:
+            self.fields[self.field_name(account)] = forms.DecimalField(
+                label=account.name,
+                required=False,
+                max_digits=15,
+                decimal_places=2,
+                widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm text-end', 'step': '0.01'}),
+            )
+    
+    @staticmethod
+    def field_name(account):
+        return f'balance_{account.pk}'
+    
+    def account_fields(self):
+        """(account, bound balance field) pairs in account order"""
+        return [(account, self[self.field_name(account)]) for account in self.accounts]
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        year, month = cleaned_data.get('year'), cleaned_data.get('month')
+        today = timezone.now().date()
+        if year and month and (year, month) > (today.year, today.month):
+            raise forms.ValidationError('Balances cannot be recorded for a future month.')
+        if not self.balances():
+            raise forms.ValidationError('Enter at least one balance.')
+        return cleaned_data
+    
+    def balances(self):
+        """{account id: balance} for every field that was filled in"""
+        return {
+            account.pk: self.cleaned_data[self.field_name(account)]
+            for account in self.accounts
+            if self.cleaned_data.get(self.field_name(account)) is not None
+        }
+
+
+class TransactionImportForm(forms.Form):
+    FORMATS = [
+        ('csv', 'CSV'),
+        ('ofx', 'OFX / QFX'),
+    ]
+    
+    account = forms.ModelChoiceField(queryset=Account.objects.none())
+    file_format = forms.ChoiceField(choices=FORMATS, initial='csv')
+    file = forms.FileField()
+    
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['account'].queryset = Account.objects.filter(user=user, is_active=True).order_by('name')
+        self.fields['account'].label_from_instance = lambda account: account.name
+        self.fields['account'].widget.attrs['class'] = 'form-select'
+        self.fields['file_format'].widget.attrs['class'] = 'form-select'
+        self.fields['file'].widget.attrs['class'] = 'form-control'
+        self.fields['file'].widget.attrs['accept'] = '.csv,.ofx,.qfx'
+
+
+class ProfileForm(forms.ModelForm):
+    class Meta:
+        model = Profile
+        fields = ['base_currency']
+        labels = {'base_currency': 'Base Currency'}
+        help_texts = {'base_currency': 'Net worth, allocation and trends are converted to this currency.'}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        currencies = available_currencies(self.instance.user_id)
+        if self.instance.base_currency not in currencies:
+            currencies.append(self.instance.base_currency)
+        self.fields['base_currency'].widget = forms.Select(
+            choices=[(currency, currency) for currency in currencies],
+            attrs={'class': 'form-select'},
+        )
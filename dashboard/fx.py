@@ -0,0 +1,177 @@
+import calendar
+import csv
+import functools
+import logging
+from array import array
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import Profile
+
+from .cache import bump_rates_version, get_rates_version
+from .models import Account, ExchangeRate
+
+
+logger = logging.getLogger(__name__)
+
+# ExchangeRate rows are quoted against this currency
+RATE_BASE_CURRENCY = 'USD'
+
+DEFAULT_BASE_CURRENCY = 'USD'
+
+
+class RateFileError(ValueError):
+    pass
+
+
+def base_currency(user_id):
+    """The currency a user's totals are reported in"""
+    currency = Profile.objects.filter(user_id=user_id).values_list('base_currency', flat=True).first()
+    return currency or DEFAULT_BASE_CURRENCY
+
+
+def available_currencies(user_id):
+    """Currencies with loaded rates, plus any the user already holds"""
+    currencies = set(ExchangeRate.objects.values_list('currency', flat=True).distinct())
+    currencies.update(Account.objects.filter(user_id=user_id).values_list('currency', flat=True).distinct())
+    currencies.add(RATE_BASE_CURRENCY)
+    return sorted(currencies)
+
+
+@functools.lru_cache(maxsize=1024)
+def cached_rate_table(year, month, version):
+    """Latest rate per currency on or before the month's last day.
+    
+    Keyed by the rates version, so loading new rates anywhere makes every
+    process fetch fresh tables instead of serving stale ones.
+    """
+    month_end = date(year, month, calendar.monthrange(year, month)[1])
+    rows = ExchangeRate.objects.filter(
+        date__lte=month_end,
+        date__gt=month_end - timedelta(days=settings.EXCHANGE_RATE_MAX_AGE),
+    ).order_by('date').values_list('currency', 'rate')
+    
+    table = {RATE_BASE_CURRENCY: 1.0}
+    for currency, rate in rows:
+        table[currency] = float(rate)
+    return table
+
+
+def rate_tables(months, version=None):
+    """Rate tables for a list of (year, month) pairs"""
+    version = get_rates_version() if version is None else version
+    return [cached_rate_table(year, month, version) for year, month in months]
+
+
+def conversion_factor(table, source, target):
+    """Multiplier taking an amount in source to target, or 1.0 when a rate is missing"""
+    if source == target:
+        return 1.0
+    try:
+        return table[target] / table[source]
+    except KeyError as exc:
+        # Leave the amount unconverted rather than dropping it from totals
+        logger.warning('No exchange rate for %s; %s amounts are not converted to %s', exc.args[0], source, target)
+        return 1.0
+
+
+def conversion_factors(source, target, months):
+    """Per-month multipliers taking amounts in source to target"""
+    return array('d', (conversion_factor(table, source, target) for table in rate_tables(months)))
+
+
+def convert_current(accounts, target):
+    """Set ``converted_balance`` on each account to its ``latest_balance`` in target at today's rates"""
+    today = timezone.now().date()
+    table = None
+    for account in accounts:
+        balance = account.latest_balance
+        if account.currency != target:
+            table = table or rate_tables([(today.year, today.month)])[0]
+            factor = Decimal(repr(conversion_factor(table, account.currency, target)))
+            balance = (balance * factor).quantize(Decimal('0.01'))
+        account.converted_balance = balance
+    return accounts
+
+
+def read_rate_file(stream, base=RATE_BASE_CURRENCY):
+    """Parse a CSV rate feed into {date: {currency: rate}} quoted against ``base``.
+    
+    Accepts long files with date, currency and rate columns, or wide files
+    with a date column followed by one column per currency (the layout of
+    the ECB's eurofxref-hist.csv). Dates are YYYY-MM-DD; blank and N/A
+    cells are skipped.
+    """
+    reader = csv.reader(stream)
+    header = [column.strip() for column in next(reader, [])]
+    lowered = [column.lower() for column in header]
+    long_format = {'date', 'currency', 'rate'} <= set(lowered)
+    
+    rates = {}
+    for line_number, row in enumerate(reader, start=2):
+        if not any(row):
+            continue
+        if long_format:
+            cells = dict(zip(lowered, row))
+            quotes = [(cells['currency'], cells['rate'])]
+            day = cells['date']
+        else:
+            quotes = zip(header[1:], row[1:])
+            day = row[0]
+        
+        try:
+            table = rates.setdefault(date.fromisoformat(day.strip()), {})
+            for currency, rate in quotes:
+                rate = rate.strip()
+                if currency and rate and rate.upper() != 'N/A':
+                    table[currency.strip().upper()] = Decimal(rate)
+        except (ValueError, InvalidOperation) as exc:
+            raise RateFileError(f'Line {line_number}: {exc!r}')
+    
+    return rates
+
+
+def rebase_rates(rates, base):
+    """Re-quote {date: {currency: rate}} from ``base`` to RATE_BASE_CURRENCY, dropping dates without a cross rate"""
+    if base == RATE_BASE_CURRENCY:
+        return rates
+    
+    rebased = {}
+    for day, table in rates.items():
+        pivot = table.get(RATE_BASE_CURRENCY)
+        if not pivot:
+            continue
+        rebased[day] = {currency: rate / pivot for currency, rate in table.items() if currency != RATE_BASE_CURRENCY}
+        rebased[day][base] = 1 / pivot
+    return rebased
+
+
+def store_rates(rates, source='', batch_size=2000):
+    """Upsert {date: {currency: rate}} rows and invalidate cached rate tables"""
+    rows = [
+        ExchangeRate(currency=currency, date=day, rate=round(rate, 10), source=source)
+        for day, table in rates.items()
+        for currency, rate in table.items()
+        if currency != RATE_BASE_CURRENCY
+    ]
+    ExchangeRate.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['date', 'currency'],
+        update_fields=['rate', 'source', 'updated_at'],
+    )
+    bump_rates_version()
+    return len(rows)
+
+
+def users_holding_foreign_currency():
+    """Ids of users with an account outside their base currency"""
+    return Account.objects.annotate(
+        base=Coalesce('user__profile__base_currency', Value(DEFAULT_BASE_CURRENCY))
+    ).exclude(currency=F('base')).values_list('user_id', flat=True).distinct()
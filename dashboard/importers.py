@@ -0,0 +1,378 @@
+import csv
+import hashlib
+import html
+import io
+import re
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+
+from .cache import bump_data_version
+from .events import publish_changes
+from .models import AccountEntry, Transaction
+from .rollups import refresh_rollups
+from .snapshots import refresh_months_since
+from .stats import refresh_account_stats
+
+
+CATEGORY_CHOICES = {category for category, label in Transaction.CATEGORIES}
+TYPE_CHOICES = {transaction_type for transaction_type, label in Transaction.TRANSACTION_TYPES}
+
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%d.%m.%Y', '%Y/%m/%d']
+
+# Accepted spellings of each CSV column, compared case-insensitively
+CSV_COLUMNS = {
+    'date': ['date', 'posted date', 'transaction date', 'posting date'],
+    'description': ['description', 'payee', 'name', 'memo', 'details'],
+    'amount': ['amount', 'value', 'transaction amount'],
+    'debit': ['debit', 'withdrawal', 'withdrawals'],
+    'credit': ['credit', 'deposit', 'deposits'],
+    'category': ['category'],
+    'transaction_type': ['type', 'transaction type'],
+    'balance': ['balance', 'running balance'],
+}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ParsedRow:
+    """A transaction read from a statement file, before it is mapped onto an account"""
+    
+    __slots__ = ['date', 'amount', 'description', 'category', 'transaction_type', 'balance', 'reference']
+    
+    def __init__(self, date, amount, description, category=None, transaction_type=None, balance=None, reference=None):
+        self.date = date
+        self.amount = amount
+        self.description = description
+        self.category = category
+        self.transaction_type = transaction_type
+        self.balance = balance
+        self.reference = reference
+
+
+class ParsedBalance:
+    """A statement balance as of a date"""
+    
+    __slots__ = ['date', 'balance']
+    
+    def __init__(self, date, balance):
+        self.date = date
+        self.balance = balance
+
+
+def parse_amount(value):
+    """Parse '1,234.56', '$-12.00' or '(12.00)' into a Decimal"""
+    value = (value or '').strip()
+    negative = value.startswith('(') and value.endswith(')')
+    cleaned = re.sub(r'[^0-9.\-]', '', value)
+    if not cleaned:
+        return None
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ImportFormatError(f'Invalid amount: {value!r}')
+    return -amount if negative else amount
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ImportFormatError(f'Unrecognized date: {value!r}')
+
+
+def parse_csv(stream):
+    """Yield ParsedRow objects from a CSV text stream, one line at a time"""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    
+    normalized = [column.strip().lower() for column in header]
+    columns = {}
+    for field, names in CSV_COLUMNS.items():
+        for name in names:
+            if name in normalized:
+                columns[field] = normalized.index(name)
+                break
+    
+    if 'date' not in columns or not ('amount' in columns or 'debit' in columns or 'credit' in columns):
+        raise ImportFormatError('CSV needs a date column and an amount (or debit/credit) column')
+    
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index] if index is not None and index < len(row) else ''
+    
+    for line_number, row in enumerate(reader, start=2):
+        if not any(row):
+            continue
+        try:
+            if 'amount' in columns:
+                amount = parse_amount(cell(row, 'amount'))
+            else:
+                credit = parse_amount(cell(row, 'credit'))
+                debit = parse_amount(cell(row, 'debit'))
+                amount = None if credit is None and debit is None else (credit or 0) - abs(debit or 0)
+            if amount is None:
+                continue
+            
+            yield ParsedRow(
+                date=parse_date(cell(row, 'date')),
+                amount=amount,
+                description=cell(row, 'description').strip(),
+                category=cell(row, 'category').strip().lower() or None,
+                transaction_type=cell(row, 'transaction_type').strip().lower() or None,
+                balance=parse_amount(cell(row, 'balance')),
+            )
+        except ImportFormatError as exc:
+            raise ImportFormatError(f'Line {line_number}: {exc}')
+
+
+def ofx_tokens(stream, chunk_size=64 * 1024):
+    """Yield (tag, text) pairs from OFX/QFX markup without reading the whole file.
+    
+    Works for both the SGML (OFX 1.x, unclosed leaf tags) and XML (OFX 2.x)
+    dialects. Closing tags are yielded as ('/TAG', '').
+    """
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        parts = (pending + chunk).split('<')
+        # Text after the last '<' may continue in the next chunk
+        pending = parts.pop() if chunk else ''
+        for part in parts:
+            if '>' in part:
+                tag, text = part.split('>', 1)
+                yield tag.strip().upper(), html.unescape(text.strip())
+        if not chunk:
+            return
+
+
+def parse_ofx_date(value):
+    """Parse OFX dates such as 20240131 or 20240131120000.000[-5:EST]"""
+    return parse_date(f'{value[:4]}-{value[4:6]}-{value[6:8]}')
+
+
+def parse_ofx(stream):
+    """Yield ParsedRow and ParsedBalance objects from an OFX/QFX text stream"""
+    record = None
+    balance = None
+    
+    for tag, text in ofx_tokens(stream):
+        if tag == 'STMTTRN':
+            record = {}
+        elif tag == '/STMTTRN' and record is not None:
+            if 'TRNAMT' not in record or 'DTPOSTED' not in record:
+                raise ImportFormatError('OFX transaction without TRNAMT or DTPOSTED')
+            yield ParsedRow(
+                date=parse_ofx_date(record['DTPOSTED']),
+                amount=parse_amount(record['TRNAMT']),
+                description=(record.get('NAME') or record.get('MEMO') or '').strip(),
+                reference=record.get('FITID'),
+            )
+            record = None
+        elif tag == 'LEDGERBAL':
+            balance = {}
+        elif tag == '/LEDGERBAL' and balance is not None:
+            if 'BALAMT' in balance and 'DTASOF' in balance:
+                yield ParsedBalance(
+                    date=parse_ofx_date(balance['DTASOF']),
+                    balance=parse_amount(balance['BALAMT']),
+                )
+            balance = None
+        elif not tag.startswith('/'):
+            if record is not None:
+                record[tag] = text
+            elif balance is not None:
+                balance[tag] = text
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'ofx': parse_ofx,
+    'qfx': parse_ofx,
+}
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.duplicates = 0
+        self.entries = 0
+        self.elapsed = 0.0
+    
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+    
+    def __str__(self):
+        return (
+            f'{self.rows} rows read, {self.created} transactions created, {self.duplicates} duplicates skipped, '
+            f'{self.entries} balance entries updated in {self.elapsed:.1f}s ({self.rows_per_second:,.0f} rows/sec)'
+        )
+
+
+class TransactionImporter:
+    """Stream a statement file into an account's transactions and monthly balances.
+    
+    Rows are written with bulk_create in batches, each batch in its own
+    database transaction, so memory stays bounded by the batch size and an
+    interrupted import can simply be re-run. Rows are deduplicated within the
+    file and against earlier imports through the unique ``Transaction.import_hash``.
+    """
+    
+    def __init__(self, account, batch_size=1000, progress=None):
+        self.account = account
+        self.batch_size = batch_size
+        # Optional callback given the running ImportResult after each batch
+        self.progress = progress
+        self.result = ImportResult()
+        self.month_balances = {}
+        # (year, month) of the earliest and latest transactions created
+        self.created_months = None
+        self.previous_date = None
+        self.occurrences = {}
+    
+    def row_hash(self, row):
+        if row.reference:
+            key = f'{self.account.pk}|fitid|{row.reference}'
+        else:
+            key = f'{self.account.pk}|{row.date.isoformat()}|{row.amount}|{row.description}'
+            # Identical rows on the same day are separate purchases, so number them.
+            # Statements are date ordered, so the counter only spans one day.
+            if row.date != self.previous_date:
+                self.occurrences = {}
+                self.previous_date = row.date
+            occurrence = self.occurrences.get(key, 0)
+            self.occurrences[key] = occurrence + 1
+            key = f'{key}|{occurrence}'
+        return hashlib.sha256(key.encode()).hexdigest()
+    
+    def build_transaction(self, row):
+        transaction_type = row.transaction_type if row.transaction_type in TYPE_CHOICES else None
+        if transaction_type is None:
+            transaction_type = 'income' if row.amount > 0 else 'expense'
+        
+        category = row.category if row.category in CATEGORY_CHOICES else 'other'
+        
+        return Transaction(
+            user_id=self.account.user_id,
+            account=self.account,
+            amount=abs(row.amount),
+            transaction_type=transaction_type,
+            category=category,
+            description=row.description[:200] or 'Imported transaction',
+            date=row.date,
+            import_hash=self.row_hash(row),
+        )
+    
+    def track_balance(self, date, balance):
+        """Keep the latest balance seen in each month"""
+        period = (date.year, date.month)
+        current = self.month_balances.get(period)
+        if current is None or date >= current[0]:
+            self.month_balances[period] = (date, balance)
+    
+    def write_batch(self, batch):
+        # A file can repeat a row, e.g. one FITID listed twice, so keep the first
+        unique = {}
+        for transaction in batch:
+            unique.setdefault(transaction.import_hash, transaction)
+        new = list(unique.values())
+        
+        stored = Transaction.objects.filter(user_id=self.account.user_id, import_hash__in=list(unique))
+        with db_transaction.atomic():
+            before = stored.count()
+            # The unique import hash skips rows written by earlier imports,
+            # including one of the same file running at the same time
+            Transaction.objects.bulk_create(new, ignore_conflicts=True)
+            created = stored.count() - before
+        
+        self.result.created += created
+        if created:
+            months = [(transaction.date.year, transaction.date.month) for transaction in new]
+            if self.created_months is not None:
+                months.extend(self.created_months)
+            self.created_months = (min(months), max(months))
+        self.result.duplicates += len(batch) - created
+        if self.progress is not None:
+            self.progress(self.result)
+    
+    def write_balances(self):
+        entries = [
+            AccountEntry(account=self.account, year=year, month=month, balance=balance, notes='Imported statement balance')
+            for (year, month), (date, balance) in sorted(self.month_balances.items())
+        ]
+        with db_transaction.atomic():
+            AccountEntry.objects.bulk_create(
+                entries,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['account', 'month', 'year'],
+                update_fields=['balance', 'updated_at'],
+            )
+        self.result.entries = len(entries)
+    
+    def refresh_derived_data(self):
+        """Bring snapshots, rollups and caches up to date with what has been written so far"""
+        # bulk_create skips signals, so everything is refreshed once here
+        if self.result.entries:
+            refresh_months_since(self.account.user_id, *min(self.month_balances))
+            refresh_account_stats([self.account.pk])
+        if self.created_months is not None:
+            refresh_rollups(self.account.user_id, *self.created_months)
+        if self.result.created or self.result.entries:
+            bump_data_version(self.account.user_id)
+            publish_changes(
+                self.account.user_id,
+                account_ids=[self.account.pk] if self.result.entries else (),
+                recent_transactions=bool(self.result.created),
+            )
+    
+    def run(self, stream, file_format='csv'):
+        """Import every record in a text stream and refresh derived data once"""
+        parser = PARSERS.get(file_format.lower())
+        if parser is None:
+            raise ImportFormatError(f'Unsupported file format: {file_format}')
+        
+        started = time.perf_counter()
+        batch = []
+        try:
+            for record in parser(stream):
+                if isinstance(record, ParsedBalance):
+                    self.track_balance(record.date, record.balance)
+                    continue
+                
+                self.result.rows += 1
+                batch.append(self.build_transaction(record))
+                if record.balance is not None:
+                    self.track_balance(record.date, record.balance)
+                
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch)
+                    batch = []
+            
+            if batch:
+                self.write_batch(batch)
+            if self.month_balances:
+                self.write_balances()
+        finally:
+            # Batches already committed stay in place when the file turns out
+            # to be malformed part way, so derived data must include them
+            self.refresh_derived_data()
+        
+        self.result.elapsed = time.perf_counter() - started
+        return self.result
+
+
+def open_text(binary_file):
+    """Wrap an uploaded or on-disk binary file for line-by-line text reading"""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', errors='replace', newline='')
@@ -0,0 +1,233 @@
+import functools
+import logging
+import tempfile
+import time
+import traceback
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import bump_data_version
+from .exports import DATASETS as EXPORT_DATASETS, EXPORT_FORMATS, export_filename, write_export
+from .importers import ImportFormatError, TransactionImporter, open_text
+from .models import Account, Job
+from .rollups import rebuild_rollups
+from .routers import replica_reads
+from .snapshots import rebuild_snapshots
+
+
+logger = logging.getLogger(__name__)
+
+# Redis list of job ids; only a wake-up signal, the jobs table is the real queue
+QUEUE_KEY = 'dashboard:jobs'
+
+# Queued jobs a worker tries in turn when it has no row locks to rely on
+CLAIM_CANDIDATES = 10
+
+
+class JobFailed(Exception):
+    """Raised by a handler for errors that retrying will not fix"""
+
+
+@functools.lru_cache(maxsize=None)
+def redis_client():
+    if not settings.REDIS_URL:
+        return None
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def notify_workers(job_id):
+    client = redis_client()
+    if client is None:
+        return
+    try:
+        client.lpush(QUEUE_KEY, job_id)
+    except redis.RedisError:
+        # Workers still find the job on their next poll of the jobs table
+        logger.warning('Could not push job %s to Redis', job_id, exc_info=True)
+
+
+def wait_for_job(timeout):
+    """Block until a job id is pushed to Redis or the timeout passes; returns the id or None"""
+    client = redis_client()
+    if client is None:
+        time.sleep(timeout)
+        return None
+    try:
+        item = client.brpop(QUEUE_KEY, timeout=timeout)
+    except redis.RedisError:
+        logger.warning('Redis unavailable, polling the jobs table instead', exc_info=True)
+        time.sleep(timeout)
+        return None
+    return int(item[1]) if item else None
+
+
+def enqueue(user, kind, payload=None, input_file=None):
+    """Create a queued job and wake a worker once the surrounding transaction commits"""
+    job = Job(user=user, kind=kind, payload=payload or {})
+    if input_file is not None:
+        job.input_file.save(input_file.name, input_file, save=False)
+    job.save()
+    transaction.on_commit(lambda: notify_workers(job.pk))
+    return job
+
+
+def set_progress(job, progress, message=''):
+    job.progress = min(int(progress), 99)
+    job.message = message[:200]
+    Job.objects.filter(pk=job.pk).update(progress=job.progress, message=job.message, updated_at=timezone.now())
+
+
+def claim_job(job_id=None):
+    """Mark the next runnable job (or job_id, if runnable) as running and return it.
+    
+    Several workers can poll at once: on PostgreSQL candidates are locked with
+    SKIP LOCKED, and everywhere the status change is a conditional UPDATE, so
+    only one worker wins each job.
+    """
+    candidates = Job.objects.filter(status='queued', run_after__lte=timezone.now()).order_by('run_after', 'id')
+    if job_id is not None:
+        candidates = candidates.filter(pk=job_id)
+    
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            return mark_running(candidates.select_for_update(skip_locked=True).first())
+    # SQLite cannot upgrade a read transaction to a write without deadlocking,
+    # so there the conditional UPDATE alone decides the winner; a worker that
+    # loses a race moves on to the next candidate
+    for job in candidates[:CLAIM_CANDIDATES]:
+        job = mark_running(job)
+        if job is not None:
+            return job
+    return None
+
+
+def mark_running(job):
+    if job is None:
+        return None
+    
+    now = timezone.now()
+    claimed = Job.objects.filter(pk=job.pk, status='queued').update(
+        status='running',
+        attempts=F('attempts') + 1,
+        progress=0,
+        message='',
+        started_at=now,
+        updated_at=now,
+    )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale_jobs(stale_after):
+    """Return jobs whose worker stopped reporting progress to the queue"""
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = Job.objects.filter(status='running', updated_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status='failed', error='Worker stopped responding', finished_at=timezone.now()
+    )
+    requeued = stale.update(status='queued', run_after=timezone.now(), message='Requeued after the worker stopped responding')
+    return requeued + failed
+
+
+def run_job(job):
+    """Run a claimed job, then record its result or schedule a retry"""
+    started = time.perf_counter()
+    try:
+        result = JOB_HANDLERS[job.kind](job) or {}
+    except JobFailed as exc:
+        finish_job(job, 'failed', error=str(exc))
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.kind, job.attempts)
+        error = ''.join(traceback.format_exception_only(type(exc), exc)).strip()
+        if job.attempts < settings.JOB_MAX_ATTEMPTS:
+            delay = settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status='queued',
+                error=error,
+                message=f'Retrying in {delay}s',
+                run_after=timezone.now() + timedelta(seconds=delay),
+                updated_at=timezone.now(),
+            )
+        else:
+            finish_job(job, 'failed', error=error)
+    else:
+        finish_job(job, 'succeeded', result=result)
+    
+    logger.info('Job %s (%s) finished in %.1fs', job.pk, job.kind, time.perf_counter() - started)
+
+
+def finish_job(job, status, result=None, error=''):
+    job.status = status
+    job.result = result or {}
+    job.error = error
+    job.progress = 100 if status == 'succeeded' else job.progress
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'progress', 'output_file', 'finished_at', 'updated_at'])
+
+
+def run_import(job):
+    account = Account.objects.filter(pk=job.payload.get('account_id'), user=job.user).first()
+    if account is None:
+        raise JobFailed('The account for this import no longer exists')
+    
+    size = job.input_file.size or 1
+    with job.input_file.open('rb') as upload:
+        binary_file = upload.file
+        
+        def progress(result):
+            set_progress(job, 100 * binary_file.tell() / size, f'{result.rows:,} rows imported')
+        
+        importer = TransactionImporter(account, progress=progress)
+        try:
+            result = importer.run(open_text(binary_file), job.payload.get('file_format', 'csv'))
+        except ImportFormatError as exc:
+            raise JobFailed(str(exc))
+    
+    job.input_file.delete(save=False)
+    return {
+        'rows': result.rows,
+        'created': result.created,
+        'duplicates': result.duplicates,
+        'entries': result.entries,
+        'summary': str(result),
+    }
+
+
+def run_export(job):
+    dataset_name = job.payload.get('dataset')
+    file_format = job.payload.get('file_format')
+    if dataset_name not in EXPORT_DATASETS or file_format not in EXPORT_FORMATS:
+        raise JobFailed(f'Unknown export: {dataset_name} as {file_format}')
+    
+    dataset = EXPORT_DATASETS[dataset_name](job.user, job.payload.get('params') or {})
+    total = dataset.queryset.count()
+    dataset.progress = lambda rows: set_progress(job, 100 * rows / max(total, 1), f'{rows:,} of {total:,} rows written')
+    
+    filename = export_filename(dataset, file_format)
+    with tempfile.TemporaryFile() as output, replica_reads():
+        write_export(dataset, file_format, output)
+        output.seek(0)
+        job.output_file.save(filename, File(output), save=False)
+    return {'filename': filename, 'rows': total}
+
+
+def run_rebuild(job):
+    months = rebuild_snapshots(job.user_id)
+    rollups = rebuild_rollups(job.user_id)
+    bump_data_version(job.user_id)
+    return {'months': months, 'rollups': rollups}
+
+
+JOB_HANDLERS = {
+    'import_transactions': run_import,
+    'export': run_export,
+    'rebuild_snapshots': run_rebuild,
+}
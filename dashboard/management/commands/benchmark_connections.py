@@ -0,0 +1,94 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .benchmark_views import percentile
+
+
+# Connection settings compared by the benchmark, as (label, CONN_MAX_AGE, CONN_HEALTH_CHECKS)
+MODES = [
+    ('per-request', 0, False),
+    ('persistent', 600, False),
+    ('persistent+health-checks', 600, True),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request database connection overhead with and without persistent connections'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Threads issuing requests at once')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per thread')
+        parser.add_argument('--database', default='default', help='Database alias to benchmark')
+    
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections.settings:
+            raise CommandError(f"Unknown database alias '{alias}'")
+        
+        settings_dict = connections.settings[alias]
+        saved = settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS']
+        self.stdout.write(
+            f"{connections[alias].vendor} database '{alias}', {options['concurrency']} threads x "
+            f"{options['requests']} requests (configured: CONN_MAX_AGE={saved[0]}, CONN_HEALTH_CHECKS={saved[1]})\n"
+        )
+        self.stdout.write(f"{'mode':<28}{'connects':>10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'req/s':>10}")
+        
+        connections.close_all()
+        try:
+            for label, max_age, health_checks in MODES:
+                # Threads build their connections from this dict, so the change applies to them
+                settings_dict['CONN_MAX_AGE'] = max_age
+                settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                self.run_mode(label, alias, options['concurrency'], options['requests'])
+        finally:
+            settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'] = saved
+    
+    def run_mode(self, label, alias, concurrency, requests):
+        timings = []
+        connects = []
+        lock = threading.Lock()
+        
+        def count_connect(sender, connection, **kwargs):
+            if connection.alias == alias:
+                with lock:
+                    connects.append(1)
+        
+        def worker():
+            connection = connections[alias]
+            local = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                # The same signals Django sends around a real request, which
+                # close or keep the connection according to its settings
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+                local.append((time.perf_counter() - started) * 1000)
+            connections.close_all()
+            with lock:
+                timings.extend(local)
+        
+        connection_created.connect(count_connect)
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection_created.disconnect(count_connect)
+        elapsed = time.perf_counter() - started
+        
+        self.stdout.write(
+            f'{label:<28}{len(connects):>10}{percentile(timings, 50):>10.2f}{percentile(timings, 95):>10.2f}'
+            f'{statistics.fmean(timings):>10.2f}{len(timings) / elapsed:>10.0f}'
+        )
@@ -0,0 +1,148 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard.synthetic import delete_users, seed_user
+from dashboard.views import ANALYTICS_SERIES
+
+
+# Data sizes per user; each tier gets its own benchmark-<tier> user
+TIERS = {
+    'small': {'accounts': 5, 'months': 12, 'transactions': 500},
+    'medium': {'accounts': 20, 'months': 60, 'transactions': 20000},
+    'large': {'accounts': 50, 'months': 120, 'transactions': 200000},
+}
+
+# The analytics page is only a shell; its work happens in the series API and
+# the async variant, so those are timed too. Each series runs with its default
+# range, and the rollup-backed series also over all time by year.
+ALL_TIME_SERIES = ['income-expenses', 'category-breakdown']
+
+
+def benchmark_urls(account):
+    """{label: URL} of every benchmarked request, in the order they run"""
+    urls = {
+        'dashboard': reverse('dashboard:dashboard'),
+        'analytics': reverse('dashboard:analytics'),
+        # Its series run in worker threads, whose queries the count below misses
+        'analytics_async': reverse('dashboard:analytics_async'),
+    }
+    for series in ANALYTICS_SERIES:
+        urls[f'api:{series}'] = reverse('dashboard:api_analytics_series', args=[series])
+    for series in ALL_TIME_SERIES:
+        urls[f'api:{series}:all-time'] = (
+            reverse('dashboard:api_analytics_series', args=[series]) + '?all_time=true&granularity=year'
+        )
+    urls['transactions_list'] = reverse('dashboard:transactions_list')
+    urls['account_detail'] = reverse('dashboard:account_detail', args=[account.pk])
+    return urls
+
+
+def percentile(samples, percent):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the dashboard views and analytics API per data-size tier and report latency percentiles and query counts'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--tiers', default='small,medium', help=f"Comma-separated tiers from: {', '.join(TIERS)}")
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per view')
+        parser.add_argument('--cold-cache', action='store_true', help='Clear the cache before every request')
+        parser.add_argument('--reseed', action='store_true', help='Recreate the benchmark users even if they exist')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the synthetic data')
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+    
+    def handle(self, *args, **options):
+        tiers = [tier.strip() for tier in options['tiers'].split(',') if tier.strip()]
+        unknown = set(tiers) - set(TIERS)
+        if unknown:
+            raise CommandError(f"Unknown tiers: {', '.join(sorted(unknown))}")
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        
+        results = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'debug': settings.DEBUG,
+            'iterations': options['iterations'],
+            'cold_cache': options['cold_cache'],
+            'tiers': {},
+        }
+        
+        # The test client talks to the 'testserver' host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for tier in tiers:
+                user = self.tier_user(tier, options)
+                results['tiers'][tier] = {
+                    'data': TIERS[tier],
+                    'views': self.benchmark_user(user, options),
+                }
+        
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+    
+    def tier_user(self, tier, options):
+        username = f'benchmark-{tier}'
+        users = User.objects.filter(username=username)
+        if options['reseed']:
+            delete_users(users)
+        
+        user = users.first()
+        if user is None:
+            started = time.perf_counter()
+            user = seed_user(username, seed=options['seed'], **TIERS[tier])
+            self.stdout.write(f'Seeded {username} in {time.perf_counter() - started:.1f}s')
+        return user
+    
+    def benchmark_user(self, user, options):
+        client = Client()
+        client.force_login(user)
+        urls = benchmark_urls(user.accounts.order_by('pk').first())
+        
+        self.stdout.write(f"\n{user.username}\n{'view':<36}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}")
+        report = {}
+        for view in urls:
+            # One untimed request warms connections, template loaders and caches
+            client.get(urls[view], secure=True)
+            
+            timings = []
+            query_counts = []
+            for _ in range(options['iterations']):
+                if options['cold_cache']:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get(urls[view], secure=True)
+                    timings.append((time.perf_counter() - started) * 1000)
+                query_counts.append(len(queries))
+                if response.status_code != 200:
+                    raise CommandError(f'{view} returned {response.status_code}')
+            
+            report[view] = {
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p95_ms': round(percentile(timings, 95), 2),
+                'p99_ms': round(percentile(timings, 99), 2),
+                'mean_ms': round(statistics.fmean(timings), 2),
+                'queries': max(query_counts),
+            }
+            row = report[view]
+            self.stdout.write(
+                f"{view:<36}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['queries']:>10}"
+            )
+        return report
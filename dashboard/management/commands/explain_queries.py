@@ -0,0 +1,98 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from dashboard.balances import with_latest_balance
+from dashboard.models import Account, AccountEntry, NetWorthSnapshot, Transaction
+from dashboard.rollups import category_totals_queryset, period_totals_queryset, range_totals_queryset
+from dashboard.snapshots import period_filter
+from dashboard.spending import category_trend_queryset, merchant_totals_queryset
+from dashboard.synthetic import delete_users, seed_user
+from dashboard.timeseries import calendar_range
+
+
+BENCHMARK_USERNAME = 'explain-benchmark'
+
+# Plan fragments that mean a dashboard table is read without an index
+FULL_SCAN_MARKERS = ('Seq Scan on dashboard_', 'SCAN dashboard_')
+
+
+def hot_queries(user):
+    """The querysets behind the dashboard views, keyed by view and purpose"""
+    today = timezone.now().date()
+    year_ago = calendar_range(today, 12)[0]
+    half_year = calendar_range(today, 6)
+    all_time = calendar_range(today, 240)
+    account = Account.objects.filter(user=user).first()
+    
+    return {
+        'dashboard.latest_balances': with_latest_balance(Account.objects.filter(user=user, is_active=True)),
+        'dashboard.recent_transactions': Transaction.objects.filter(user=user).order_by('-date')[:10],
+        'analytics.net_worth_snapshots': NetWorthSnapshot.objects.filter(
+            period_filter((year_ago.year, year_ago.month), (today.year, today.month)), user=user
+        ),
+        'analytics.income_expenses': period_totals_queryset(user, *half_year),
+        'analytics.income_expenses_yearly': period_totals_queryset(user, *all_time, 'year'),
+        'analytics.range_totals': range_totals_queryset(user, *all_time),
+        'analytics.spending_by_category': category_totals_queryset(user, *half_year),
+        'spending.category_trends': category_trend_queryset(user, *half_year),
+        'spending.top_merchants': merchant_totals_queryset(user, 'expense', *half_year),
+        'transactions_list': Transaction.objects.filter(user=user).order_by('-date', '-created_at')[:50],
+        'account_detail.entries': AccountEntry.objects.filter(account=account).order_by('-year', '-month')[:24],
+        'account_detail.transactions': Transaction.objects.filter(account=account).order_by('-date')[:50],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the hot dashboard queries and flag full table scans'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Explain queries for this existing username')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help=f"Seed '{BENCHMARK_USERNAME}' with this many transactions first (replacing any previous run)",
+        )
+        parser.add_argument('--accounts', type=int, default=50, help='Accounts to create when seeding')
+        parser.add_argument('--months', type=int, default=120, help='Months of balance history to create when seeding')
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE (PostgreSQL only)')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan for every query')
+    
+    def handle(self, *args, **options):
+        if options['seed']:
+            delete_users(User.objects.filter(username=BENCHMARK_USERNAME))
+            started = time.perf_counter()
+            user = seed_user(
+                BENCHMARK_USERNAME,
+                accounts=options['accounts'],
+                months=options['months'],
+                transactions=options['seed'],
+            )
+            self.stdout.write(f"Seeded {options['seed']} transactions in {time.perf_counter() - started:.1f}s")
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        else:
+            username = options['user'] or BENCHMARK_USERNAME
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"User '{username}' does not exist; pass --user or --seed")
+        
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options['analyze'] = True
+        
+        full_scans = 0
+        for name, queryset in hot_queries(user).items():
+            plan = queryset.explain(**explain_options)
+            uses_full_scan = any(marker in plan for marker in FULL_SCAN_MARKERS)
+            full_scans += uses_full_scan
+            
+            status = self.style.ERROR('FULL SCAN') if uses_full_scan else self.style.SUCCESS('index')
+            self.stdout.write(f'{name:<34} {status}')
+            if uses_full_scan or options['verbose_plans']:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+        
+        if full_scans:
+            raise CommandError(f'{full_scans} queries read a dashboard table without an index')
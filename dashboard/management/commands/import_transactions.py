@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.importers import ImportFormatError, TransactionImporter, open_text
+from dashboard.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Import transactions and statement balances from a CSV or OFX/QFX file into an account'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV, OFX or QFX file to import')
+        parser.add_argument('--account', type=int, required=True, help='ID of the account to import into')
+        parser.add_argument('--format', choices=['csv', 'ofx', 'qfx'], help='File format (defaults to the file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+    
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        
+        account = Account.objects.filter(pk=options['account']).first()
+        if account is None:
+            raise CommandError(f"Account {options['account']} does not exist")
+        
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        importer = TransactionImporter(account, batch_size=options['batch_size'])
+        
+        try:
+            with path.open('rb') as binary_file:
+                result = importer.run(open_text(binary_file), file_format)
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+        
+        self.stdout.write(self.style.SUCCESS(str(result)))
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.cache import bump_data_version
+from dashboard.fx import RateFileError, read_rate_file, rebase_rates, store_rates, users_holding_foreign_currency
+from dashboard.jobs import enqueue
+from dashboard.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Load daily or monthly exchange rates from a CSV feed and revalue mixed-currency users'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with date,currency,rate rows or one column per currency')
+        parser.add_argument('--base', default='USD', help='Currency the file quotes rates against (e.g. EUR for ECB files)')
+        parser.add_argument('--source', help='Label stored with each rate (defaults to the file name)')
+        parser.add_argument('--background', action='store_true', help='Queue snapshot rebuilds for run_jobs instead of running them here')
+    
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        
+        base = options['base'].upper()
+        try:
+            with path.open(newline='', encoding='utf-8-sig') as stream:
+                rates = rebase_rates(read_rate_file(stream), base)
+        except RateFileError as exc:
+            raise CommandError(str(exc))
+        
+        count = store_rates(rates, source=options['source'] or path.name)
+        self.stdout.write(f'Loaded {count} rates over {len(rates)} days')
+        
+        # Stored snapshots were valued at the old rates
+        user_ids = list(users_holding_foreign_currency())
+        for user_id in user_ids:
+            if options['background']:
+                enqueue(User.objects.get(pk=user_id), 'rebuild_snapshots')
+            else:
+                rebuild_snapshots(user_id)
+                bump_data_version(user_id)
+        
+        action = 'Queued snapshot rebuilds' if options['background'] else 'Revalued snapshots'
+        self.stdout.write(self.style.SUCCESS(f'{action} for {len(user_ids)} users holding foreign currencies'))
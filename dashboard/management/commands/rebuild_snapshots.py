@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.jobs import enqueue
+from dashboard.rollups import rebuild_rollups
+from dashboard.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild monthly net worth snapshots and transaction rollups from account entries and transactions'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild snapshots for this username')
+        parser.add_argument('--background', action='store_true', help='Queue one job per user for run_jobs instead')
+    
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"User '{options['user']}' does not exist")
+        
+        if options['background']:
+            queued = 0
+            for user in users.order_by('pk').iterator():
+                enqueue(user, 'rebuild_snapshots')
+                queued += 1
+            self.stdout.write(self.style.SUCCESS(f'Queued {queued} snapshot rebuilds'))
+            return
+        
+        total = 0
+        total_rollups = 0
+        for user_id, username in users.order_by('pk').values_list('pk', 'username').iterator():
+            count = rebuild_snapshots(user_id)
+            rollups = rebuild_rollups(user_id)
+            total += count
+            total_rollups += rollups
+            if count or rollups:
+                self.stdout.write(f'{username}: {count} months, {rollups} rollup rows')
+        
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} net worth snapshots and {total_rollups} transaction rollups'))
@@ -0,0 +1,46 @@
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from dashboard.jobs import claim_job, requeue_stale_jobs, run_job, wait_for_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued imports, exports and snapshot rebuilds; start more processes to add throughput'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no job is ready instead of waiting for more')
+        parser.add_argument('--poll-interval', type=int, default=5, help='Seconds to wait for new work between checks')
+        parser.add_argument(
+            '--stale-after', type=int, default=15 * 60,
+            help='Requeue running jobs that have reported no progress for this many seconds',
+        )
+    
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        
+        processed = 0
+        hint = None
+        while not self.stopping:
+            close_old_connections()
+            job = (claim_job(hint) if hint else None) or claim_job()
+            if job is not None:
+                self.stdout.write(f'Running {job}')
+                run_job(job)
+                processed += 1
+                hint = None
+                continue
+            
+            if options['once']:
+                break
+            requeue_stale_jobs(options['stale_after'])
+            hint = wait_for_job(options['poll_interval'])
+        
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
+    
+    def stop(self, signum, frame):
+        # Let the current job finish, then exit
+        self.stopping = True
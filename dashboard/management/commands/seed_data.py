@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.synthetic import delete_users, seed_user
+
+
+class Command(BaseCommand):
+    help = 'Create synthetic users with accounts, monthly balance history and transactions'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1, help='Number of users to create')
+        parser.add_argument('--accounts', type=int, default=10, help='Accounts per user')
+        parser.add_argument('--months', type=int, default=24, help='Months of balance entries per account')
+        parser.add_argument('--transactions', type=int, default=1000, help='Transactions per user')
+        parser.add_argument('--prefix', default='synthetic', help='Usernames are <prefix>-<n>')
+        parser.add_argument('--seed', type=int, help='Random seed for repeatable data')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--replace', action='store_true', help='Delete existing users with this prefix first')
+    
+    def handle(self, *args, **options):
+        existing = User.objects.filter(username__startswith=f"{options['prefix']}-")
+        if options['replace']:
+            deleted = existing.count()
+            delete_users(existing)
+            self.stdout.write(f'Deleted {deleted} existing users')
+        elif existing.exists():
+            raise CommandError(f"Users named {options['prefix']}-* already exist; pass --replace or another --prefix")
+        
+        started = time.perf_counter()
+        for n in range(1, options['users'] + 1):
+            user_started = time.perf_counter()
+            seed = None if options['seed'] is None else options['seed'] + n
+            user = seed_user(
+                f"{options['prefix']}-{n}",
+                accounts=options['accounts'],
+                months=options['months'],
+                transactions=options['transactions'],
+                batch_size=options['batch_size'],
+                seed=seed,
+            )
+            self.stdout.write(f'{user.username}: {time.perf_counter() - user_started:.1f}s')
+        
+        elapsed = time.perf_counter() - started
+        rows = options['users'] * (options['accounts'] * (options['months'] + 1) + options['transactions'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['users']} users ({rows:,} rows) in {elapsed:.1f}s"
+        ))
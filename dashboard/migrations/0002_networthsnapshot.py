@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-17 00:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetWorthSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.IntegerField(choices=[(1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (6, 6), (7, 7), (8, 8), (9, 9), (10, 10), (11, 11), (12, 12)])),
+                ('year', models.IntegerField()),
+                ('total_assets', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('total_liabilities', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('net_worth', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('breakdown', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='net_worth_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+                'unique_together': {('user', 'year', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-17 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_networthsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', '-created_at'], name='account_active_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='accountentry',
+            index=models.Index(fields=['account', '-year', '-month', 'balance'], name='entry_account_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-date', '-created_at'], name='transaction_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_type', 'date', 'category', 'amount'], name='transaction_user_type_date_idx'),
+        ),
+    ]
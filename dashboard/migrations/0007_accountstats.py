@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-17 01:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_exchangerate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountStats',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='dashboard.account')),
+                ('latest_balance', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('latest_year', models.IntegerField(blank=True, null=True)),
+                ('latest_month', models.IntegerField(blank=True, null=True)),
+                ('recent_balances', models.JSONField(blank=True, default=list)),
+                ('growth_1m', models.FloatField(blank=True, null=True)),
+                ('growth_3m', models.FloatField(blank=True, null=True)),
+                ('growth_6m', models.FloatField(blank=True, null=True)),
+                ('growth_12m', models.FloatField(blank=True, null=True)),
+                ('min_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('max_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('volatility', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'account stats',
+            },
+        ),
+    ]
@@ -0,0 +1,127 @@
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+
+# Copies of the snapshot code's rules as of this migration, so later changes
+# to dashboard.snapshots or dashboard.fx cannot change what it writes
+LIABILITY_ACCOUNT_TYPES = ('loan', 'credit')
+RATE_BASE_CURRENCY = 'USD'
+DEFAULT_BASE_CURRENCY = 'USD'
+
+
+def months_between(first, last):
+    year, month = first
+    while (year, month) <= last:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def rate_table(ExchangeRate, year, month):
+    """Latest rate per currency on or before the month's last day, quoted against RATE_BASE_CURRENCY"""
+    month_end = date(year, month, calendar.monthrange(year, month)[1])
+    rows = ExchangeRate.objects.filter(
+        date__lte=month_end,
+        date__gt=month_end - timedelta(days=settings.EXCHANGE_RATE_MAX_AGE),
+    ).order_by('date').values_list('currency', 'rate')
+
+    table = {RATE_BASE_CURRENCY: 1.0}
+    for currency, rate in rows:
+        table[currency] = float(rate)
+    return table
+
+
+def conversion_factor(table, source, target):
+    if source == target:
+        return 1.0
+    try:
+        return table[target] / table[source]
+    except KeyError:
+        return 1.0
+
+
+def user_snapshots(apps, user_id, rate_tables):
+    """Snapshot rows from the user's first entry to this month, with balances carried forward"""
+    AccountEntry = apps.get_model('dashboard', 'AccountEntry')
+    ExchangeRate = apps.get_model('dashboard', 'ExchangeRate')
+    NetWorthSnapshot = apps.get_model('dashboard', 'NetWorthSnapshot')
+    Profile = apps.get_model('users', 'Profile')
+
+    periods = AccountEntry.objects.filter(account__user_id=user_id).order_by('year', 'month').values_list('year', 'month')
+    first = periods.first()
+    if first is None:
+        return []
+    today = timezone.now().date()
+    months = list(months_between(first, max(periods.last(), (today.year, today.month))))
+    columns = {month: column for column, month in enumerate(months)}
+
+    target = Profile.objects.filter(user_id=user_id).values_list('base_currency', flat=True).first() or DEFAULT_BASE_CURRENCY
+    assets = [0.0] * len(months)
+    liabilities = [0.0] * len(months)
+    breakdown = [{} for month in months]
+
+    rows = AccountEntry.objects.filter(account__user_id=user_id, account__is_active=True).order_by(
+        'account_id', 'year', 'month'
+    ).values_list('account_id', 'account__account_type', 'account__asset_type', 'account__currency', 'year', 'month', 'balance')
+    for (account_id, account_type, asset_type, currency), entries in groupby(rows, key=lambda row: row[:4]):
+        balances = {columns[(year, month)]: float(balance) for *_, year, month, balance in entries if (year, month) in columns}
+        current = 0.0
+        for column, (year, month) in enumerate(months):
+            current = balances.get(column, current)
+            if currency != target:
+                if (year, month) not in rate_tables:
+                    rate_tables[(year, month)] = rate_table(ExchangeRate, year, month)
+                balance = current * conversion_factor(rate_tables[(year, month)], currency, target)
+            else:
+                balance = current
+            if account_type in LIABILITY_ACCOUNT_TYPES:
+                liabilities[column] += abs(balance)
+            else:
+                assets[column] += balance
+                breakdown[column][asset_type] = breakdown[column].get(asset_type, 0.0) + balance
+
+    return [
+        NetWorthSnapshot(
+            user_id=user_id,
+            year=year,
+            month=month,
+            total_assets=Decimal(str(round(assets[column], 2))),
+            total_liabilities=Decimal(str(round(liabilities[column], 2))),
+            net_worth=Decimal(str(round(assets[column] - liabilities[column], 2))),
+            breakdown={asset_type: round(total, 2) for asset_type, total in breakdown[column].items() if total},
+        )
+        for column, (year, month) in enumerate(months)
+    ]
+
+
+def backfill_snapshots(apps, schema_editor):
+    """Build the snapshot rows of users whose entries predate the snapshot table.
+
+    Snapshots are otherwise only refreshed around the months a write touches,
+    so existing history would read as zero.
+    """
+    AccountEntry = apps.get_model('dashboard', 'AccountEntry')
+    NetWorthSnapshot = apps.get_model('dashboard', 'NetWorthSnapshot')
+
+    rate_tables = {}
+    user_ids = AccountEntry.objects.values_list('account__user_id', flat=True).distinct().order_by()
+    for user_id in list(user_ids):
+        NetWorthSnapshot.objects.filter(user_id=user_id).delete()
+        NetWorthSnapshot.objects.bulk_create(user_snapshots(apps, user_id, rate_tables), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_transactionrollup'),
+        ('users', '0001_profile'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+# Months per rollup tier as of this migration, so later changes to
+# dashboard.rollups cannot change what it writes
+TIER_MONTHS = {'month': 1, 'quarter': 3, 'year': 12}
+
+
+def backfill_rollups(apps, schema_editor):
+    """Build the rollup rows of users whose transactions predate the rollup table.
+
+    Rollups are otherwise only refreshed for the months a write touches, so
+    existing history would be missing from the coarser tiers.
+    """
+    Transaction = apps.get_model('dashboard', 'Transaction')
+    TransactionRollup = apps.get_model('dashboard', 'TransactionRollup')
+
+    rollups = {}
+    monthly = Transaction.objects.annotate(period=TruncMonth('date')).values(
+        'user_id', 'period', 'transaction_type', 'category'
+    ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+    for row in monthly.iterator():
+        year, month = row['period'].year, row['period'].month
+        for tier, size in TIER_MONTHS.items():
+            key = (row['user_id'], tier, year, (month - 1) // size * size + 1, row['transaction_type'], row['category'])
+            totals = rollups.setdefault(key, [Decimal('0.00'), 0])
+            totals[0] += row['total']
+            totals[1] += row['count']
+
+    TransactionRollup.objects.all().delete()
+    TransactionRollup.objects.bulk_create([
+        TransactionRollup(
+            user_id=user_id, tier=tier, year=year, month=month,
+            transaction_type=transaction_type, category=category, total=total, count=count,
+        )
+        for (user_id, tier, year, month, transaction_type, category), (total, count) in rollups.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_backfill_networthsnapshots'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:03
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def clear_duplicate_import_hashes(apps, schema_editor):
+    """Keep the hash on the first of any rows imported twice, so the constraint can be added.
+
+    The later copies stay as ordinary transactions rather than being deleted.
+    """
+    Transaction = apps.get_model('dashboard', 'Transaction')
+    duplicates = Transaction.objects.exclude(import_hash='').values('user_id', 'import_hash').annotate(
+        copies=Count('id')
+    ).filter(copies__gt=1).order_by()
+    for duplicate in list(duplicates):
+        ids = Transaction.objects.filter(
+            user_id=duplicate['user_id'], import_hash=duplicate['import_hash']
+        ).order_by('id').values_list('id', flat=True)
+        Transaction.objects.filter(pk__in=list(ids[1:])).update(import_hash='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_backfill_transactionrollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_import_hashes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('import_hash', ''), _negated=True), fields=('user', 'import_hash'), name='transaction_unique_import_hash'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -58,6 +60,13 @@ class Account(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['user', 'name']
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='account_active_user_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.account_type}) - {self.user.username}"
@@ -79,6 +88,12 @@ class Transaction(models.Model):
         ('transfer', 'Transfer'),
     ]
     
+    # Bootstrap contextual color for each type's badge and amount
+    TYPE_COLORS = {
+        'income': 'success',
+        'expense': 'danger',
+    }
+    
     CATEGORIES = [
         ('salary', 'Salary'),
         ('freelance', 'Freelance'),
@@ -102,14 +117,37 @@ class Transaction(models.Model):
     category = models.CharField(max_length=20, choices=CATEGORIES)
     description = models.CharField(max_length=200)
     date = models.DateField()
+    import_hash = models.CharField(max_length=64, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['user', 'import_hash'], name='transaction_import_hash_idx'),
+            models.Index(fields=['user', '-date', '-created_at'], name='transaction_user_date_idx'),
+            # Trailing category/amount columns let type/date range aggregates
+            # be answered from the index alone
+            models.Index(
+                fields=['user', 'transaction_type', 'date', 'category', 'amount'],
+                name='transaction_user_type_date_idx',
+            ),
+        ]
+        constraints = [
+            # Imported rows are deduplicated on their hash; manual entries have none
+            models.UniqueConstraint(
+                fields=['user', 'import_hash'],
+                condition=~models.Q(import_hash=''),
+                name='transaction_unique_import_hash',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.description} - {self.amount} ({self.transaction_type})"
+    
+    @property
+    def type_color(self):
+        return self.TYPE_COLORS.get(self.transaction_type, 'warning')
 
 
 class AccountEntry(models.Model):
@@ -124,6 +162,186 @@ class AccountEntry(models.Model):
     class Meta:
         ordering = ['-year', '-month']
         unique_together = ['account', 'month', 'year']
+        indexes = [
+            models.Index(fields=['account', '-year', '-month', 'balance'], name='entry_account_period_idx'),
+        ]
     
     def __str__(self):
         return f"{self.account.name} - {self.month}/{self.year}: {self.balance}"
+
+
+class AccountStats(models.Model):
+    """Rolling balance statistics for one account, kept current by the entry signals"""
+    account = models.OneToOneField(Account, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    latest_balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    latest_year = models.IntegerField(null=True, blank=True)
+    latest_month = models.IntegerField(null=True, blank=True)
+    # The most recent entries' balances, oldest first
+    recent_balances = models.JSONField(default=list, blank=True)
+    # Percent change from the balance 1, 3, 6 and 12 months before the latest entry
+    growth_1m = models.FloatField(null=True, blank=True)
+    growth_3m = models.FloatField(null=True, blank=True)
+    growth_6m = models.FloatField(null=True, blank=True)
+    growth_12m = models.FloatField(null=True, blank=True)
+    min_balance = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    max_balance = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    # Standard deviation of month-over-month percent changes
+    volatility = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'account stats'
+    
+    def __str__(self):
+        return f"{self.account_id}: {self.latest_balance}"
+    
+    @property
+    def growth(self):
+        """(label, percent) pairs for the growth columns"""
+        return [('1M', self.growth_1m), ('3M', self.growth_3m), ('6M', self.growth_6m), ('12M', self.growth_12m)]
+    
+    @property
+    def sparkline_points(self):
+        """SVG polyline points for recent_balances in a 100x30 box"""
+        balances = self.recent_balances
+        if len(balances) < 2:
+            return ''
+        low, high = min(balances), max(balances)
+        spread = (high - low) or 1
+        step = 100 / (len(balances) - 1)
+        return ' '.join(
+            f'{index * step:.1f},{30 - (balance - low) / spread * 30:.1f}' for index, balance in enumerate(balances)
+        )
+
+
+class NetWorthSnapshot(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='net_worth_snapshots')
+    month = models.IntegerField(choices=[(i, i) for i in range(1, 13)])
+    year = models.IntegerField()
+    total_assets = models.DecimalField(max_digits=15, decimal_places=2)
+    total_liabilities = models.DecimalField(max_digits=15, decimal_places=2)
+    net_worth = models.DecimalField(max_digits=15, decimal_places=2)
+    breakdown = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-year', '-month']
+        unique_together = ['user', 'year', 'month']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.month}/{self.year}: {self.net_worth}"
+
+
+class TransactionRollup(models.Model):
+    """Transaction totals for one type and category over a month, quarter or year.
+    
+    Every tier is kept current by the transaction signals and bulk writers, so
+    a long range at a coarse granularity reads a few rows instead of every
+    transaction.
+    """
+    TIERS = [
+        ('month', 'Month'),
+        ('quarter', 'Quarter'),
+        ('year', 'Year'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transaction_rollups')
+    tier = models.CharField(max_length=10, choices=TIERS)
+    # The period's first month, so every tier filters and orders on (year, month)
+    year = models.IntegerField()
+    month = models.IntegerField(choices=[(i, i) for i in range(1, 13)])
+    transaction_type = models.CharField(max_length=20, choices=Transaction.TRANSACTION_TYPES)
+    category = models.CharField(max_length=20, choices=Transaction.CATEGORIES)
+    total = models.DecimalField(max_digits=15, decimal_places=2)
+    count = models.PositiveIntegerField()
+    
+    class Meta:
+        ordering = ['tier', 'year', 'month']
+        unique_together = ['user', 'tier', 'year', 'month', 'transaction_type', 'category']
+    
+    def __str__(self):
+        return f"{self.user_id} {self.tier} {self.month}/{self.year} {self.transaction_type}/{self.category}: {self.total}"
+
+
+class ExchangeRate(models.Model):
+    currency = models.CharField(max_length=3)
+    date = models.DateField()
+    # Units of ``currency`` per one US dollar on ``date``
+    rate = models.DecimalField(max_digits=20, decimal_places=10)
+    source = models.CharField(max_length=50, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date', 'currency']
+        unique_together = ['date', 'currency']
+    
+    def __str__(self):
+        return f"{self.currency} {self.date}: {self.rate}"
+
+
+class VersionStamp(models.Model):
+    """Version stamp of a user's data or of the exchange rates, shared by every process.
+    
+    Cache keys, fragments and ETags include a stamp, and each write replaces
+    it, so nothing cached under the old stamp is read again. It lives in the
+    database rather than the cache so web processes and the job worker always
+    agree, even when each process has its own cache.
+    """
+    key = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+
+
+def job_storage():
+    """Private storage for job uploads and results, outside the public MEDIA_ROOT"""
+    return FileSystemStorage(location=settings.JOB_FILES_ROOT)
+
+
+class Job(models.Model):
+    KINDS = [
+        ('import_transactions', 'Transaction Import'),
+        ('export', 'Export'),
+        ('rebuild_snapshots', 'Snapshot Rebuild'),
+    ]
+    
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=30, choices=KINDS)
+    status = models.CharField(max_length=20, choices=STATUSES, default='queued')
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    message = models.CharField(max_length=200, blank=True)
+    input_file = models.FileField(storage=job_storage, upload_to='input/%Y/%m/', blank=True)
+    output_file = models.FileField(storage=job_storage, upload_to='output/%Y/%m/', blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Workers only ever scan the queued jobs
+            models.Index(fields=['run_after', 'id'], condition=models.Q(status='queued'), name='job_queued_idx'),
+            models.Index(fields=['user', '-created_at'], name='job_user_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
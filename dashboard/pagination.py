@@ -0,0 +1,103 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+
+# Integer keys are 64-bit columns; larger values overflow some database drivers
+MAX_INTEGER_KEY = 2 ** 63 - 1
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    """One page of results plus the cursors needed to reach its neighbours"""
+    
+    def __init__(self, object_list, has_next, has_previous, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Cursor pagination over a queryset ordered by descending key fields.
+    
+    Each page is fetched with a ``WHERE (keys) < cursor ORDER BY keys DESC
+    LIMIT n`` style query, so deep pages cost the same as the first one. The
+    last key must be unique (normally ``id``) to break ties.
+    """
+    
+    def __init__(self, queryset, keys, per_page=50):
+        self.queryset = queryset
+        self.keys = keys
+        self.per_page = per_page
+    
+    def encode_cursor(self, obj):
+        values = []
+        for key in self.keys:
+            value = getattr(obj, key)
+            values.append(value.isoformat() if isinstance(value, (date, datetime)) else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+    
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(self.keys) or None in values:
+                raise ValueError(cursor)
+            opts = self.queryset.model._meta
+            values = [opts.get_field(key).clean(value, None) for key, value in zip(self.keys, values)]
+            if any(isinstance(value, int) and abs(value) > MAX_INTEGER_KEY for value in values):
+                raise ValueError(cursor)
+            return values
+        except (binascii.Error, TypeError, ValueError, ValidationError) as exc:
+            raise InvalidCursor('That page cursor is not valid') from exc
+    
+    def beyond(self, values, lookup):
+        """Rows whose key tuple compares ``lookup`` ('lt' or 'gt') against values"""
+        condition = Q()
+        for i, key in enumerate(self.keys):
+            prefix = dict(zip(self.keys[:i], values[:i]))
+            condition |= Q(**prefix, **{f'{key}__{lookup}': values[i]})
+        return condition
+    
+    def page(self, after=None, before=None):
+        """Return the page following cursor ``after``, preceding ``before``, or the first page"""
+        descending = [f'-{key}' for key in self.keys]
+        
+        if before:
+            rows = list(
+                self.queryset.filter(self.beyond(self.decode_cursor(before), 'gt')).order_by(*self.keys)[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after:
+                queryset = queryset.filter(self.beyond(self.decode_cursor(after), 'lt'))
+            rows = list(queryset.order_by(*descending)[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            object_list = rows[:self.per_page]
+            has_previous = bool(after)
+        
+        return KeysetPage(
+            object_list,
+            has_next=has_next and bool(object_list),
+            has_previous=has_previous and bool(object_list),
+            next_cursor=self.encode_cursor(object_list[-1]) if object_list else None,
+            previous_cursor=self.encode_cursor(object_list[0]) if object_list else None,
+        )
@@ -0,0 +1,146 @@
+import contextvars
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+
+logger = logging.getLogger('dashboard.performance')
+
+# Most queries each dashboard URL may run for a user with about 30 accounts,
+# keyed by URL name. The middleware logs a warning when a request goes over, and
+# dashboard.testing.QueryBudgetMixin fails tests that do.
+QUERY_BUDGETS = {
+    'landing': 2,
+    'dashboard': 6,
+    # Session and user; the stream itself queries only when an update is published
+    'live_updates': 2,
+    'analytics': 5,
+    'analytics_async': 15,
+    'accounts_list': 4,
+    'account_detail': 9,
+    # Saving a month upserts every balance, then refreshes snapshots and stats once
+    'month_close': 15,
+    'transactions_list': 5,
+    'import_transactions': 4,
+    'export_data': 5,
+    'job_detail': 4,
+    'job_download': 4,
+    'api_accounts': 4,
+    'api_account_entries': 5,
+    'api_month_close': 15,
+    'api_transactions': 4,
+    'api_analytics_series': 6,
+    'api_jobs': 4,
+    'api_job_status': 4,
+    'settings': 6,
+    'terms_of_service': 1,
+    'privacy_policy': 1,
+    'signup_disabled': 1,
+}
+
+current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Query count and time spent in the database and templates during one request"""
+    
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+    
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper() to time every query
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+@contextmanager
+def instrument_connections(metrics):
+    """Count and time every query run on this thread's connections into metrics"""
+    with ExitStack() as stack:
+        if metrics is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+        yield
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        
+        started = time.perf_counter()
+        db_time = metrics.db_time
+        try:
+            return super().render(context, request)
+        finally:
+            # Lazy querysets evaluated while rendering count as database time
+            metrics.template_time += time.perf_counter() - started - (metrics.db_time - db_time)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that adds render time to the current request's metrics"""
+    
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+    
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+class PerformanceMiddleware:
+    """Report query count, DB time, template time and total time for every request.
+    
+    The numbers go out as a Server-Timing header (visible in browser dev
+    tools) and as one JSON log line on the ``dashboard.performance`` logger.
+    Queries run while a streaming response is consumed are not included.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with instrument_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        total_time = time.perf_counter() - started
+        
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f};desc="Templates"',
+            f'total;dur={total_time * 1000:.1f}',
+        ])
+        
+        match = request.resolver_match
+        view = match.url_name if match else None
+        budget = QUERY_BUDGETS.get(view) if match and match.app_name == 'dashboard' else None
+        over_budget = budget is not None and metrics.queries > budget
+        
+        logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'query_budget': budget,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'total_ms': round(total_time * 1000, 1),
+        }))
+        return response
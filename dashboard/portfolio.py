@@ -0,0 +1,84 @@
+import threading
+
+from .balances import BalanceSnapshot, with_latest_balance
+from .cache import get_data_version
+from .fx import base_currency
+from .models import Account, AccountEntry
+from .snapshots import period_filter
+
+
+class AccountRecord:
+    """The fields of an active account the analytics read, without a model instance"""
+    
+    __slots__ = ('id', 'name', 'account_type', 'asset_type', 'currency', 'latest_balance', 'converted_balance')
+    
+    def __init__(self, id, name, account_type, asset_type, currency, latest_balance):
+        self.id = id
+        self.name = name
+        self.account_type = account_type
+        self.asset_type = asset_type
+        self.currency = currency
+        self.latest_balance = latest_balance
+        self.converted_balance = latest_balance
+
+
+def account_records(accounts):
+    """AccountRecords for an account queryset, with their latest balances, in one query"""
+    rows = with_latest_balance(accounts).values_list(
+        'id', 'name', 'account_type', 'asset_type', 'currency', 'latest_balance'
+    )
+    return [AccountRecord(*row) for row in rows]
+
+
+class Portfolio:
+    """One user's active accounts and balance history, shared by the analytics helpers of a request.
+    
+    Accounts are read once with their latest balances into AccountRecord
+    rows, and each range of balance history is read once. Nothing is queried
+    until a helper needs it, so helpers answered from the cache only cost the
+    one read of the data version their keys share. The async analytics view shares one portfolio between its worker
+    threads, so loading is serialized.
+    """
+    
+    def __init__(self, user, data_version=None):
+        self.user = user
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._data_version = data_version
+        self._histories = {}
+    
+    @property
+    def data_version(self):
+        """The user's data version, read once for every cached helper of the request unless given"""
+        with self._lock:
+            if self._data_version is None:
+                self._data_version = get_data_version(self.user.pk)
+            return self._data_version
+    
+    @property
+    def snapshot(self):
+        """BalanceSnapshot of the accounts' current balances in the user's base currency"""
+        with self._lock:
+            if self._snapshot is None:
+                accounts = account_records(Account.objects.filter(user=self.user, is_active=True))
+                self._snapshot = BalanceSnapshot(accounts, base_currency(self.user.pk))
+            return self._snapshot
+    
+    @property
+    def accounts(self):
+        return self.snapshot.accounts
+    
+    def history(self, start_date, end_date):
+        """{account id: [('YYYY-MM', balance), ...] newest first} for entries between two dates"""
+        key = (start_date.year, start_date.month, end_date.year, end_date.month)
+        with self._lock:
+            if key not in self._histories:
+                histories = {}
+                for account_id, year, month, balance in AccountEntry.objects.filter(
+                    period_filter(key[:2], key[2:]),
+                    account__user=self.user,
+                    account__is_active=True,
+                ).order_by('-year', '-month').values_list('account_id', 'year', 'month', 'balance'):
+                    histories.setdefault(account_id, []).append((f'{year:04d}-{month:02d}', float(balance)))
+                self._histories[key] = histories
+            return self._histories[key]
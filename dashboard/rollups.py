@@ -0,0 +1,194 @@
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .aggregates import TRANSACTION_TOTALS, sum_by_type
+from .models import AccountEntry, Transaction, TransactionRollup
+from .routers import primary_reads
+from .snapshots import period_filter
+from .timeseries import period_label, period_start
+
+
+# Tiers summed from the month tier rather than from transactions
+COARSE_TIERS = ('quarter', 'year')
+
+ROLLUP_UPSERT = {
+    'update_conflicts': True,
+    'unique_fields': ['user', 'tier', 'year', 'month', 'transaction_type', 'category'],
+    'update_fields': ['total', 'count'],
+}
+
+
+def month_bounds(start, end):
+    """First and last day of the months start..end, given as (year, month) pairs"""
+    return date(*start, 1), date(*end, calendar.monthrange(*end)[1])
+
+
+def refresh_rollups(user_id, start, end):
+    """Recompute every tier of a user's rollups for the months start..end, as (year, month) pairs.
+    
+    The month tier is aggregated from transactions in the range; quarter and
+    year rows are re-summed from the month tier for each year the range
+    touches. Everything is read from the primary, since the coarse tiers are
+    summed from month rows a lagging replica may not have yet.
+    """
+    if start > end:
+        return 0
+    
+    first_day, last_day = month_bounds(start, end)
+    years = (start[0], 1), (end[0], 12)
+    with primary_reads(), db_transaction.atomic():
+        monthly = [
+            TransactionRollup(
+                user_id=user_id,
+                tier='month',
+                year=row['period'].year,
+                month=row['period'].month,
+                transaction_type=row['transaction_type'],
+                category=row['category'],
+                total=row['total'],
+                count=row['count'],
+            )
+            for row in Transaction.objects.filter(user_id=user_id, date__gte=first_day, date__lte=last_day).annotate(
+                period=TruncMonth('date')
+            ).values('period', 'transaction_type', 'category').annotate(total=Sum('amount'), count=Count('id')).order_by()
+        ]
+        TransactionRollup.objects.filter(period_filter(start, end), user_id=user_id, tier='month').delete()
+        # Upserts, so a concurrent refresh of the same months cannot collide
+        TransactionRollup.objects.bulk_create(monthly, **ROLLUP_UPSERT)
+        
+        coarse = {}
+        for year, month, transaction_type, category, total, count in TransactionRollup.objects.filter(
+            period_filter(*years), user_id=user_id, tier='month'
+        ).values_list('year', 'month', 'transaction_type', 'category', 'total', 'count'):
+            for tier in COARSE_TIERS:
+                key = (tier, *period_start(year, month, tier), transaction_type, category)
+                totals = coarse.setdefault(key, [Decimal('0.00'), 0])
+                totals[0] += total
+                totals[1] += count
+        
+        TransactionRollup.objects.filter(period_filter(*years), user_id=user_id, tier__in=COARSE_TIERS).delete()
+        TransactionRollup.objects.bulk_create([
+            TransactionRollup(
+                user_id=user_id, tier=tier, year=year, month=month,
+                transaction_type=transaction_type, category=category, total=total, count=count,
+            )
+            for (tier, year, month, transaction_type, category), (total, count) in coarse.items()
+        ], **ROLLUP_UPSERT)
+    return len(monthly) + len(coarse)
+
+
+def refresh_transaction_months(user_id, *dates):
+    """Refresh the rollups for the months of the given transaction dates, e.g. after one is saved"""
+    for month in sorted({(day.year, day.month) for day in dates}):
+        refresh_rollups(user_id, month, month)
+
+
+def rebuild_rollups(user_id):
+    """Recompute every rollup row for a user from their full transaction history"""
+    with primary_reads():
+        span = Transaction.objects.filter(user_id=user_id).aggregate(first=Min('date'), last=Max('date'))
+    with db_transaction.atomic():
+        TransactionRollup.objects.filter(user_id=user_id).delete()
+        if span['first'] is None:
+            return 0
+        return refresh_rollups(user_id, (span['first'].year, span['first'].month), (span['last'].year, span['last'].month))
+
+
+def first_data_month(user_id):
+    """The earliest (year, month) with a transaction or balance entry, or None without data"""
+    candidates = []
+    first_transaction = Transaction.objects.filter(user_id=user_id).aggregate(first=Min('date'))['first']
+    if first_transaction is not None:
+        candidates.append((first_transaction.year, first_transaction.month))
+    first_entry = AccountEntry.objects.filter(account__user_id=user_id).order_by('year', 'month').values_list(
+        'year', 'month'
+    ).first()
+    if first_entry is not None:
+        candidates.append(first_entry)
+    return min(candidates, default=None)
+
+
+def range_filter(start_date, end_date):
+    """Q object matching the fewest rollup rows that exactly cover the whole months of a date range.
+    
+    Whole years inside the range come from the year tier and the months on
+    either side from the month tier, so a 20-year range reads about 20 rows
+    per type and category plus at most 22 months.
+    """
+    start = (start_date.year, start_date.month)
+    end = (end_date.year, end_date.month)
+    first_year = start[0] if start[1] == 1 else start[0] + 1
+    last_year = end[0] if end[1] == 12 else end[0] - 1
+    if first_year > last_year:
+        return Q(period_filter(start, end), tier='month')
+    
+    whole_years = Q(tier='year', year__gte=first_year, year__lte=last_year)
+    before = Q(period_filter(start, (first_year - 1, 12)), tier='month')
+    after = Q(period_filter((last_year + 1, 1), end), tier='month')
+    return whole_years | before | after
+
+
+def read_rollups(user, rows):
+    """Evaluate a queryset over the user's rollups, building them first if the user has none yet"""
+    result = list(rows)
+    if not result and not TransactionRollup.objects.filter(user=user).exists():
+        # The fresh rows are only on the primary until a replica catches up
+        with primary_reads():
+            if rebuild_rollups(user.pk):
+                result = list(rows.all())
+    return result
+
+
+def period_totals_queryset(user, start_date, end_date, granularity='month'):
+    """Grouped queryset of per-period totals by transaction type from one rollup tier"""
+    start = period_start(start_date.year, start_date.month, granularity)
+    return TransactionRollup.objects.filter(
+        period_filter(start, (end_date.year, end_date.month)), user=user, tier=granularity
+    ).values('year', 'month').annotate(
+        **{name: sum_by_type(transaction_type, 'total') for name, transaction_type in TRANSACTION_TOTALS.items()}
+    ).order_by('year', 'month')
+
+
+def period_totals(user, start_date, end_date, granularity='month'):
+    """Income, expense and transfer totals per month, quarter or year, from that tier's rollups.
+    
+    Returns one dict per period with transactions, in order, with the
+    period's first (year, month) under ``period`` and its label under
+    ``label``. The range should already be aligned to whole periods.
+    """
+    totals = []
+    for row in read_rollups(user, period_totals_queryset(user, start_date, end_date, granularity)):
+        period = (row.pop('year'), row.pop('month'))
+        totals.append({'period': period, 'label': period_label(*period, granularity), **row})
+    return totals
+
+
+def range_totals_queryset(user, start_date, end_date):
+    """Grouped queryset of totals by transaction type over the whole months of a date range"""
+    return TransactionRollup.objects.filter(range_filter(start_date, end_date), user=user).values(
+        'transaction_type'
+    ).annotate(total=Sum('total')).order_by()
+
+
+def range_totals(user, start_date, end_date):
+    """Income, expense and transfer totals over the whole months of a date range"""
+    rows = read_rollups(user, range_totals_queryset(user, start_date, end_date))
+    by_type = {row['transaction_type']: row['total'] for row in rows}
+    return {name: by_type.get(transaction_type, Decimal('0.00')) for name, transaction_type in TRANSACTION_TOTALS.items()}
+
+
+def category_totals_queryset(user, start_date, end_date, transaction_type='expense'):
+    """Grouped queryset of (category, total) for one transaction type over the whole months of a date range"""
+    return TransactionRollup.objects.filter(
+        range_filter(start_date, end_date), user=user, transaction_type=transaction_type
+    ).values_list('category').annotate(total=Sum('total')).order_by('-total', 'category')
+
+
+def category_totals(user, start_date, end_date, transaction_type='expense'):
+    """(category, total) pairs for one transaction type over the whole months of a date range, largest first"""
+    return read_rollups(user, category_totals_queryset(user, start_date, end_date, transaction_type))
@@ -0,0 +1,123 @@
+import asyncio
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+REPLICA_ALIAS = 'replica'
+
+# Session key holding the time until which the user's reads stay on the primary
+STICKY_SESSION_KEY = 'dashboard_primary_until'
+
+# Alias reads are routed to in the current context, or None for the default
+read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def reads_from(alias):
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+def replica_reads():
+    """Send reads in this block to the replica, when one is configured"""
+    return reads_from(REPLICA_ALIAS if replica_configured() else None)
+
+
+def primary_reads():
+    """Send reads in this block to the primary, e.g. to read back a write made inside a replica view"""
+    return reads_from(None)
+
+
+class ReplicaRouter:
+    """Route reads to the replica inside ``use_replica`` views and ``replica_reads`` blocks.
+    
+    Everything else, including all writes, uses the default database. The
+    replica is never migrated; it receives the schema from the primary.
+    """
+    
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+    
+    def db_for_write(self, model, **hints):
+        return None
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA_ALIAS else None
+
+
+def is_sticky(request):
+    """Whether the user wrote recently enough that the replica may not have caught up"""
+    return request.session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+def streaming_from_replica(content):
+    # Streaming responses run their queries after the view returns
+    with replica_reads():
+        yield from content
+
+
+def use_replica(view):
+    """Serve a read-only view from the replica unless the user has just written.
+    
+    Works on sync and async views. Inside the view, wrap any read that must
+    see a write made in the same request in ``primary_reads()``.
+    """
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not replica_configured() or await sync_to_async(is_sticky)(request):
+                return await view(request, *args, **kwargs)
+            with replica_reads():
+                return await view(request, *args, **kwargs)
+        
+        return async_wrapper
+    
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_configured() or is_sticky(request):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            response = view(request, *args, **kwargs)
+        if response.streaming:
+            response.streaming_content = streaming_from_replica(response.streaming_content)
+        return response
+    
+    return wrapper
+
+
+class StickyPrimaryMiddleware:
+    """After a user's successful write, keep their reads on the primary for REPLICA_STICKY_SECONDS.
+    
+    This gives them read-your-writes consistency while the replica catches up.
+    Place it after SessionMiddleware. It does nothing without a replica.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            replica_configured()
+            and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            and response.status_code < 400
+            and hasattr(request, 'session')
+        ):
+            request.session[STICKY_SESSION_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
+        return response
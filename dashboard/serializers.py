@@ -0,0 +1,74 @@
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Account, AccountEntry, Job, Transaction
+
+
+class AccountSerializer(serializers.ModelSerializer):
+    latest_balance = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = Account
+        fields = [
+            'id', 'name', 'account_type', 'classification', 'asset_type', 'currency',
+            'institution', 'is_active', 'latest_balance', 'created_at', 'updated_at',
+        ]
+
+
+class AccountEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AccountEntry
+        fields = ['id', 'account', 'month', 'year', 'balance', 'notes', 'created_at', 'updated_at']
+
+
+class MonthCloseSerializer(serializers.Serializer):
+    """A month's balances for several accounts, keyed by account id"""
+    year = serializers.IntegerField(min_value=1900, max_value=2100)
+    month = serializers.IntegerField(min_value=1, max_value=12)
+    balances = serializers.DictField(
+        child=serializers.DecimalField(max_digits=15, decimal_places=2), allow_empty=False
+    )
+    
+    def validate_balances(self, balances):
+        try:
+            balances = {int(account_id): balance for account_id, balance in balances.items()}
+        except ValueError:
+            raise serializers.ValidationError('Keys must be account ids.')
+        
+        owned = set(Account.objects.filter(user=self.context['user'], pk__in=balances).values_list('pk', flat=True))
+        unknown = sorted(set(balances) - owned)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown accounts: {', '.join(map(str, unknown))}")
+        return balances
+    
+    def validate(self, data):
+        today = timezone.now().date()
+        if (data['year'], data['month']) > (today.year, today.month):
+            raise serializers.ValidationError('Balances cannot be recorded for a future month.')
+        return data
+
+
+class TransactionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Transaction
+        fields = [
+            'id', 'account', 'amount', 'transaction_type', 'category',
+            'description', 'date', 'created_at', 'updated_at',
+        ]
+
+
+class JobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'status', 'progress', 'message', 'result', 'error', 'attempts',
+            'download_url', 'created_at', 'started_at', 'finished_at',
+        ]
+    
+    def get_download_url(self, job):
+        if job.status != 'succeeded' or not job.output_file:
+            return None
+        return reverse('dashboard:job_download', args=[job.pk])
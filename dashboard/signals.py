@@ -0,0 +1,132 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import Profile
+
+from .cache import bump_data_version
+from .events import publish_changes
+from .models import Account, AccountEntry, Transaction
+from .rollups import rebuild_rollups, refresh_transaction_months
+from .snapshots import rebuild_snapshots, refresh_entry_months
+from .stats import refresh_account_stats
+
+
+# Account fields the net worth snapshots depend on
+ACCOUNT_SNAPSHOT_FIELDS = ('account_type', 'asset_type', 'currency', 'is_active')
+
+
+def get_entry_user_id(entry):
+    """Owner of an entry's account, or None once the account itself is gone"""
+    return Account.objects.filter(pk=entry.account_id).values_list('user_id', flat=True).first()
+
+
+@receiver(pre_save, sender=AccountEntry)
+def remember_entry_period(sender, instance, **kwargs):
+    """Keep the stored period so a re-dated entry also refreshes the month it left"""
+    instance._previous_period = None
+    if instance.pk:
+        instance._previous_period = AccountEntry.objects.filter(
+            pk=instance.pk
+        ).values_list('account_id', 'year', 'month').first()
+
+
+@receiver(post_save, sender=AccountEntry)
+def refresh_snapshots_for_saved_entry(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    
+    user_id = get_entry_user_id(instance)
+    if user_id is None:
+        return
+    
+    previous = getattr(instance, '_previous_period', None)
+    if previous and previous != (instance.account_id, instance.year, instance.month):
+        refresh_entry_months(previous[0], user_id, previous[1], previous[2])
+    refresh_entry_months(instance.account_id, user_id, instance.year, instance.month)
+    account_ids = {instance.account_id, previous[0]} if previous else {instance.account_id}
+    refresh_account_stats(account_ids)
+    bump_data_version(user_id)
+    publish_changes(user_id, account_ids=account_ids)
+
+
+@receiver(post_delete, sender=AccountEntry)
+def refresh_snapshots_for_deleted_entry(sender, instance, origin=None, **kwargs):
+    # Entries deleted along with their account or user are covered by the
+    # account's post_delete handler, which refreshes everything once
+    if getattr(origin, 'model', type(origin)) is not AccountEntry:
+        return
+    
+    user_id = get_entry_user_id(instance)
+    if user_id is not None:
+        refresh_entry_months(instance.account_id, user_id, instance.year, instance.month)
+        refresh_account_stats([instance.account_id])
+        bump_data_version(user_id)
+        publish_changes(user_id, account_ids=[instance.account_id])
+
+
+@receiver(pre_save, sender=Account)
+def remember_account_snapshot_fields(sender, instance, **kwargs):
+    """Keep the stored fields the snapshots read, so edits that leave them alone skip the rebuild"""
+    instance._previous_snapshot_fields = None
+    if instance.pk:
+        instance._previous_snapshot_fields = Account.objects.filter(
+            pk=instance.pk
+        ).values_list(*ACCOUNT_SNAPSHOT_FIELDS).first()
+
+
+@receiver(post_save, sender=Account)
+def refresh_snapshots_for_saved_account(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        bump_data_version(instance.user_id)
+        return
+    
+    # A new account has no entries yet, so the snapshots are unchanged
+    previous = getattr(instance, '_previous_snapshot_fields', None)
+    if not created and previous != tuple(getattr(instance, field) for field in ACCOUNT_SNAPSHOT_FIELDS):
+        rebuild_snapshots(instance.user_id)
+    refresh_account_stats([instance.pk])
+    bump_data_version(instance.user_id)
+    publish_changes(instance.user_id, account_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=Account)
+def refresh_snapshots_for_deleted_account(sender, instance, **kwargs):
+    # One refresh for the account's entries and transactions, which went with it
+    rebuild_snapshots(instance.user_id)
+    rebuild_rollups(instance.user_id)
+    bump_data_version(instance.user_id)
+    publish_changes(instance.user_id, account_ids=[instance.pk])
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_transaction_date(sender, instance, **kwargs):
+    """Keep the stored date so a re-dated transaction also refreshes the month it left"""
+    instance._previous_date = None
+    if instance.pk:
+        instance._previous_date = Transaction.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Transaction)
+def refresh_rollups_for_saved_transaction(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        previous = getattr(instance, '_previous_date', None)
+        refresh_transaction_months(instance.user_id, instance.date, *([previous] if previous else []))
+    bump_data_version(instance.user_id)
+    if created:
+        publish_changes(instance.user_id, transaction_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=Transaction)
+def refresh_rollups_for_deleted_transaction(sender, instance, origin=None, **kwargs):
+    # Deleting the account or user refreshes the rollups and version once instead
+    if getattr(origin, 'model', type(origin)) is Transaction:
+        refresh_transaction_months(instance.user_id, instance.date)
+        bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def refresh_snapshots_for_profile(sender, instance, raw=False, **kwargs):
+    # Snapshots are stored in the base currency, so a new one means a rebuild
+    if not raw:
+        rebuild_snapshots(instance.user_id)
+        bump_data_version(instance.user_id)
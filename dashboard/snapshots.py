@@ -0,0 +1,155 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .fx import base_currency
+from .models import AccountEntry, NetWorthSnapshot
+from .routers import primary_reads
+from .timeseries import BalanceMatrix, month_from_index, month_index, month_range, period_label, period_start
+
+
+def period_filter(start, end):
+    """Q object matching (year, month) rows between two (year, month) pairs inclusive"""
+    start_year, start_month = start
+    end_year, end_month = end
+    return (
+        (Q(year__gt=start_year) | Q(year=start_year, month__gte=start_month))
+        & (Q(year__lt=end_year) | Q(year=end_year, month__lte=end_month))
+    )
+
+
+def snapshot_horizon(user_id):
+    """The first and last month a user's snapshots should cover, or None without entries"""
+    periods = AccountEntry.objects.filter(account__user_id=user_id).order_by('year', 'month').values_list('year', 'month')
+    first = periods.first()
+    if first is None:
+        return None
+    
+    today = timezone.now().date()
+    return first, max(periods.last(), (today.year, today.month))
+
+
+def refresh_snapshots(user_id, start, end):
+    """Recompute and upsert the user's snapshot rows for months start..end inclusive"""
+    if start > end:
+        return 0
+    
+    matrix = BalanceMatrix.for_user(user_id, date(*start, 1), date(*end, 1)).convert(base_currency(user_id))
+    snapshots = [
+        NetWorthSnapshot(
+            user_id=user_id,
+            year=year,
+            month=month,
+            total_assets=Decimal(str(totals['assets'])),
+            total_liabilities=Decimal(str(totals['liabilities'])),
+            net_worth=Decimal(str(totals['net_worth'])),
+            breakdown=breakdown,
+        )
+        for (year, month), totals, breakdown in zip(matrix.months, matrix.totals(), matrix.breakdown())
+    ]
+    
+    NetWorthSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['user', 'year', 'month'],
+        update_fields=['total_assets', 'total_liabilities', 'net_worth', 'breakdown', 'updated_at'],
+    )
+    return len(snapshots)
+
+
+def refresh_entry_months(account_id, user_id, year, month):
+    """Refresh the months whose carried-forward balance depends on one account entry"""
+    horizon = snapshot_horizon(user_id)
+    if horizon is None:
+        NetWorthSnapshot.objects.filter(user_id=user_id).delete()
+        return 0
+    
+    next_entry = AccountEntry.objects.filter(
+        Q(year__gt=year) | Q(year=year, month__gt=month),
+        account_id=account_id,
+    ).order_by('year', 'month').values_list('year', 'month').first()
+    
+    first, last = horizon
+    if next_entry is not None:
+        last = month_from_index(month_index(*next_entry) - 1)
+    
+    # Months before the user's first entry carry no balances at all
+    NetWorthSnapshot.objects.filter(user_id=user_id).exclude(period_filter(first, horizon[1])).delete()
+    return refresh_snapshots(user_id, max(first, (year, month)), last)
+
+
+def refresh_months_since(user_id, year, month):
+    """Refresh every month from year/month onward, e.g. after a bulk write"""
+    horizon = snapshot_horizon(user_id)
+    if horizon is None:
+        NetWorthSnapshot.objects.filter(user_id=user_id).delete()
+        return 0
+    
+    first, last = horizon
+    NetWorthSnapshot.objects.filter(user_id=user_id).exclude(period_filter(first, last)).delete()
+    return refresh_snapshots(user_id, max(first, (year, month)), last)
+
+
+def rebuild_snapshots(user_id):
+    """Recompute every snapshot row for a user from their full entry history"""
+    return refresh_months_since(user_id, 1, 1)
+
+
+def net_worth_series(user, start_date, end_date, granularity='month'):
+    """Assets, liabilities and net worth at the end of each month, quarter or year, read from the snapshot table.
+    
+    Balances are point in time, so a quarter or year shows its last month in
+    the range and only those months' rows are read.
+    """
+    months = month_range(start_date, end_date)
+    # First month of each period -> its last month in the range
+    samples = {period_start(*period, granularity): period for period in months}
+    snapshots = NetWorthSnapshot.objects.filter(user=user).values_list(
+        'year', 'month', 'total_assets', 'total_liabilities', 'net_worth'
+    )
+    
+    in_range = snapshots.filter(period_filter(months[0], months[-1]))
+    if granularity != 'month':
+        in_range = in_range.filter(month__in={month for year, month in samples.values()})
+    in_range = in_range.order_by('year', 'month')
+    rows = list(in_range)
+    has_snapshots = bool(rows) or snapshots.exists()
+    if not has_snapshots:
+        # Rebuild from, and read back, the primary: a lagging replica would
+        # be missing the entries and the fresh rows
+        with primary_reads():
+            if rebuild_snapshots(user.pk):
+                has_snapshots = True
+                rows = list(in_range.all())
+    
+    by_month = {(year, month): totals for year, month, *totals in rows}
+    
+    # Snapshots run unbroken from the first entry to the last refresh, so a
+    # missing month either predates every entry or is past the last refresh and
+    # carries forward the most recent snapshot. Either way consecutive months
+    # and every month after a carried one share the same answer.
+    latest = None
+    checked = False
+    carrying = False
+    series = []
+    for first_month, period in samples.items():
+        totals = by_month.get(period)
+        if totals is not None:
+            latest = (*period, *totals)
+        else:
+            if has_snapshots and not carrying and not (granularity == 'month' and checked):
+                latest = snapshots.filter(period_filter((1, 1), period)).order_by('-year', '-month').first()
+            carrying = latest is not None
+            totals = latest[2:] if latest is not None else (0, 0, 0)
+        checked = True
+        assets, liabilities, net_worth = totals
+        series.append({
+            'date': period_label(*first_month, granularity),
+            'net_worth': float(net_worth),
+            'assets': float(assets),
+            'liabilities': float(liabilities),
+        })
+    
+    return series
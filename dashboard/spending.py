@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from .colors import CATEGORY_COLORS, OTHER_COLOR
+from .models import Transaction, TransactionRollup
+from .rollups import read_rollups
+from .snapshots import period_filter
+from .timeseries import align_range, month_range, period_label, period_start
+
+
+# Categories charted on their own; the rest are merged into one entry
+TOP_CATEGORIES = 6
+
+# Merchants (transaction descriptions) listed per category
+TOP_MERCHANTS = 5
+
+OTHER_CATEGORIES = 'other_categories'
+
+CATEGORY_LABELS = dict(Transaction.CATEGORIES)
+
+
+def period_deltas(trend):
+    """Change from the previous period for each value of a trend, None for the first"""
+    return [None] + [round(current - previous, 2) for previous, current in zip(trend, trend[1:])]
+
+
+def merchant_totals_queryset(user, transaction_type, start_date, end_date):
+    """Grouped queryset of (category, description, total, count), largest first within each category"""
+    return Transaction.objects.filter(
+        user=user, transaction_type=transaction_type, date__gte=start_date, date__lte=end_date
+    ).values_list('category', 'description').annotate(
+        total=Sum('amount'), count=Count('id')
+    ).order_by('category', '-total', 'description')
+
+
+def category_trend_queryset(user, start_date, end_date, granularity='month', transaction_type='expense'):
+    """(year, month, category, total) rows of one rollup tier for a range aligned to whole periods"""
+    return TransactionRollup.objects.filter(
+        period_filter((start_date.year, start_date.month), (end_date.year, end_date.month)),
+        user=user,
+        tier=granularity,
+        transaction_type=transaction_type,
+    ).values_list('year', 'month', 'category', 'total')
+
+
+def top_merchants(user, transaction_type, start_date, end_date, limit):
+    """{category: [(description, total, count), ...] largest first}, at most ``limit`` per category.
+    
+    One grouped query ordered by category and total; rows past each
+    category's limit are skipped as they stream in.
+    """
+    rows = merchant_totals_queryset(user, transaction_type, start_date, end_date)
+    merchants = {}
+    for category, description, total, count in rows.iterator():
+        listed = merchants.setdefault(category, [])
+        if len(listed) < limit:
+            listed.append((description, total, count))
+    return merchants
+
+
+def category_entry(category, label, color, trend, merchants, grand_total):
+    total = sum(trend, Decimal('0.00'))
+    listed = sorted(merchants, key=lambda merchant: (-merchant[1], merchant[0]))[:TOP_MERCHANTS]
+    trend = [float(value) for value in trend]
+    return {
+        'category': category,
+        'label': label,
+        'color': color,
+        'total': float(total),
+        'share': round(float(total / grand_total * 100), 2) if grand_total else 0,
+        'trend': trend,
+        'deltas': period_deltas(trend),
+        'merchants': [
+            {'description': description, 'total': float(amount), 'count': count}
+            for description, amount, count in listed
+        ],
+        # Spending at merchants past the top ones, so the list adds up to the total
+        'other_merchants': float(total - sum((amount for description, amount, count in listed), Decimal('0.00'))),
+    }
+
+
+def category_breakdown(user, start_date, end_date, granularity='month', transaction_type='expense', top=TOP_CATEGORIES):
+    """Spending per category per month, quarter or year, with changes and top merchants.
+    
+    The per-period totals come from that tier's rollups and the merchants from
+    one grouped transaction query, so the cost does not grow with the number
+    of categories or periods. The ``top`` largest categories are listed on
+    their own, largest first, followed by one entry merging the rest.
+    """
+    start_date, end_date = align_range(start_date, end_date, granularity)
+    periods = list(dict.fromkeys(period_start(*month, granularity) for month in month_range(start_date, end_date)))
+    columns = {period: column for column, period in enumerate(periods)}
+    
+    rows = category_trend_queryset(user, start_date, end_date, granularity, transaction_type)
+    trends = {}
+    for year, month, category, total in read_rollups(user, rows):
+        trends.setdefault(category, [Decimal('0.00')] * len(periods))[columns[(year, month)]] += total
+    
+    merchants = top_merchants(user, transaction_type, start_date, end_date, TOP_MERCHANTS) if trends else {}
+    ranked = sorted(trends, key=lambda category: (-sum(trends[category]), category))
+    period_totals = [sum(values, Decimal('0.00')) for values in zip(*trends.values())] or [Decimal('0.00')] * len(periods)
+    grand_total = sum(period_totals, Decimal('0.00'))
+    
+    categories = [
+        category_entry(
+            category,
+            CATEGORY_LABELS.get(category, category),
+            CATEGORY_COLORS.get(category, OTHER_COLOR),
+            trends[category],
+            merchants.get(category, []),
+            grand_total,
+        )
+        for category in ranked[:top]
+    ]
+    
+    rest = ranked[top:]
+    if rest:
+        entry = category_entry(
+            OTHER_CATEGORIES,
+            'Other categories',
+            OTHER_COLOR,
+            [sum(values, Decimal('0.00')) for values in zip(*(trends[category] for category in rest))],
+            # The top merchants across merged categories are among each one's top merchants
+            [merchant for category in rest for merchant in merchants.get(category, [])],
+            grand_total,
+        )
+        entry['categories'] = [CATEGORY_LABELS.get(category, category) for category in rest]
+        categories.append(entry)
+    
+    totals = [float(total) for total in period_totals]
+    return {
+        'granularity': granularity,
+        'periods': [period_label(*period, granularity) for period in periods],
+        'totals': totals,
+        'deltas': period_deltas(totals),
+        'total': float(grand_total),
+        'categories': categories,
+    }
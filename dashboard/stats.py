@@ -0,0 +1,106 @@
+import statistics
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import AccountEntry, AccountStats
+from .routers import primary_reads
+from .timeseries import month_index
+
+
+# Balances kept for sparklines, and the growth periods reported, in months
+STATS_MONTHS = 12
+GROWTH_PERIODS = (1, 3, 6, 12)
+
+STATS_FIELDS = [
+    'latest_balance', 'latest_year', 'latest_month', 'recent_balances',
+    *(f'growth_{months}m' for months in GROWTH_PERIODS),
+    'min_balance', 'max_balance', 'volatility',
+]
+
+
+def percent_change(initial, final):
+    """Percent change from initial to final, or None when it is undefined"""
+    if initial is None or initial == 0:
+        return None
+    return float((final - initial) / abs(initial) * 100)
+
+
+def balance_stats(entries):
+    """AccountStats field values from one account's (year, month, balance) entries, newest first.
+    
+    Entries must include everything back to the last one on or before
+    GROWTH_PERIODS[-1] months before the newest; the most recent
+    STATS_MONTHS + 1 entries always do.
+    """
+    if not entries:
+        return {field: None for field in STATS_FIELDS} | {'latest_balance': 0, 'recent_balances': []}
+    
+    latest_year, latest_month, latest_balance = entries[0]
+    latest_index = month_index(latest_year, latest_month)
+    
+    def balance_at(index):
+        # Months without an entry carry the previous balance forward
+        for year, month, balance in entries:
+            if month_index(year, month) <= index:
+                return balance
+        return None
+    
+    recent = [balance for year, month, balance in reversed(entries[:STATS_MONTHS])]
+    changes = [percent_change(previous, current) for previous, current in zip(recent, recent[1:])]
+    changes = [change for change in changes if change is not None]
+    
+    stats = {
+        'latest_balance': latest_balance,
+        'latest_year': latest_year,
+        'latest_month': latest_month,
+        'recent_balances': [float(balance) for balance in recent],
+        'min_balance': min(recent),
+        'max_balance': max(recent),
+        'volatility': statistics.pstdev(changes) if len(changes) > 1 else None,
+    }
+    for months in GROWTH_PERIODS:
+        stats[f'growth_{months}m'] = percent_change(balance_at(latest_index - months), latest_balance)
+    return stats
+
+
+def refresh_account_stats(account_ids, batch_size=500):
+    """Recompute and upsert AccountStats for the given accounts, one query per batch"""
+    account_ids = list(account_ids)
+    refreshed = 0
+    for start in range(0, len(account_ids), batch_size):
+        batch = account_ids[start:start + batch_size]
+        rows = AccountEntry.objects.filter(account_id__in=batch).annotate(
+            rank=Window(RowNumber(), partition_by=F('account_id'), order_by=[F('year').desc(), F('month').desc()])
+        ).filter(rank__lte=STATS_MONTHS + 1).order_by('account_id', '-year', '-month').values_list(
+            'account_id', 'year', 'month', 'balance'
+        )
+        
+        entries = {account_id: [] for account_id in batch}
+        for account_id, *entry in rows:
+            entries[account_id].append(entry)
+        
+        AccountStats.objects.bulk_create(
+            [AccountStats(account_id=account_id, **balance_stats(history)) for account_id, history in entries.items()],
+            update_conflicts=True,
+            unique_fields=['account'],
+            update_fields=[*STATS_FIELDS, 'updated_at'],
+        )
+        refreshed += len(batch)
+    return refreshed
+
+
+def with_stats(accounts):
+    """Evaluate an account queryset with its stats joined, filling in any that are missing"""
+    accounts = list(accounts.select_related('stats'))
+    missing = [account.pk for account in accounts if not hasattr(account, 'stats')]
+    if missing:
+        # Accounts created before the stats table existed; read them back from
+        # the primary in case this runs on a replica
+        with primary_reads():
+            refresh_account_stats(missing)
+            stats = AccountStats.objects.in_bulk(missing)
+        for account in accounts:
+            if account.pk in stats:
+                account.stats = stats[account.pk]
+    return accounts
@@ -0,0 +1,98 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .models import Account, AccountEntry, Transaction
+from .rollups import rebuild_rollups
+from .snapshots import rebuild_snapshots
+from .stats import refresh_account_stats
+from .timeseries import month_from_index, month_index
+
+
+ACCOUNT_TYPES = [account_type for account_type, label in Account.ACCOUNT_TYPES]
+ASSET_TYPES = [asset_type for asset_type, label in Account.ASSET_TYPES]
+CATEGORIES = [category for category, label in Transaction.CATEGORIES]
+INCOME_CATEGORIES = ['salary', 'freelance', 'investment']
+EXPENSE_CATEGORIES = [category for category in CATEGORIES if category not in INCOME_CATEGORIES]
+
+
+def generate_transactions(user, accounts, count, days, rng):
+    """Yield unsaved transactions spread over the last ``days`` days"""
+    today = timezone.now().date()
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.15:
+            transaction_type, category = 'income', rng.choice(INCOME_CATEGORIES)
+        elif roll < 0.95:
+            transaction_type, category = 'expense', rng.choice(EXPENSE_CATEGORIES)
+        else:
+            transaction_type, category = 'transfer', 'other'
+        
+        yield Transaction(
+            user=user,
+            account=rng.choice(accounts),
+            amount=Decimal(rng.randint(100, 500000)) / 100,
+            transaction_type=transaction_type,
+            category=category,
+            description=f'{category.title()} #{rng.randint(1, 200)}',
+            date=today - timedelta(days=rng.randrange(days)),
+        )
+
+
+def seed_user(username, accounts=10, months=24, transactions=1000, batch_size=5000, seed=None):
+    """Create a user with synthetic accounts, monthly entries and transactions.
+    
+    Everything is written with bulk_create, so signals do not fire; the
+    user's account stats, net worth snapshots and transaction rollups are
+    rebuilt once instead.
+    """
+    rng = random.Random(seed)
+    user = User.objects.create_user(username=username, email=f'{username}@example.com')
+    user.set_unusable_password()
+    user.save(update_fields=['password'])
+    
+    created_accounts = Account.objects.bulk_create([
+        Account(
+            user=user,
+            name=f'Account {i + 1}',
+            account_type=ACCOUNT_TYPES[i % len(ACCOUNT_TYPES)],
+            asset_type=rng.choice(ASSET_TYPES),
+        )
+        for i in range(accounts)
+    ])
+    
+    today = timezone.now().date()
+    current = month_index(today.year, today.month)
+    entries = []
+    for account in created_accounts:
+        balance = Decimal(rng.randint(1000, 10000000)) / 100
+        for index in range(current - months + 1, current + 1):
+            year, month = month_from_index(index)
+            balance = (balance * Decimal(rng.uniform(0.97, 1.04))).quantize(Decimal('0.01'))
+            entries.append(AccountEntry(account=account, year=year, month=month, balance=balance))
+    AccountEntry.objects.bulk_create(entries, batch_size=batch_size)
+    refresh_account_stats(account.pk for account in created_accounts)
+    
+    pending = []
+    for transaction in generate_transactions(user, created_accounts, transactions, months * 31, rng):
+        pending.append(transaction)
+        if len(pending) >= batch_size:
+            Transaction.objects.bulk_create(pending)
+            pending = []
+    Transaction.objects.bulk_create(pending)
+    
+    rebuild_snapshots(user.pk)
+    rebuild_rollups(user.pk)
+    return user
+
+
+def delete_users(users):
+    """Delete users and all of their financial data.
+    
+    Cascaded entries and transactions skip their per-row signal handlers, so
+    each deleted account refreshes the derived tables once.
+    """
+    return users.delete()
@@ -0,0 +1,61 @@
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .performance import QUERY_BUDGETS
+from .urls import app_name, urlpatterns
+
+
+# Query count reported by PerformanceMiddleware, which includes queries run on
+# pool threads, such as the series of the async analytics page
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class QueryBudgetMixin:
+    """TestCase mixin that fails when a dashboard URL runs more queries than its budget.
+    
+    Log a client in during setUp, then call ``assertWithinQueryBudget`` for
+    one URL or ``assertAllWithinQueryBudgets`` to request every URL in
+    dashboard/urls.py. Budgets live in ``dashboard.performance.QUERY_BUDGETS``.
+    """
+    
+    query_budgets = QUERY_BUDGETS
+    
+    def assertWithinQueryBudget(self, url_name, args=(), data=None, method='get', status=200, **extra):
+        """Request one URL and check its status as well, so a redirect to login or an error page cannot pass"""
+        if url_name not in self.query_budgets:
+            self.fail(f"'{url_name}' has no entry in QUERY_BUDGETS")
+        budget = self.query_budgets[url_name]
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(reverse(f'{app_name}:{url_name}', args=args), data, **extra)
+            if hasattr(response, 'streaming_content'):
+                # Streaming responses query while they are consumed
+                b''.join(response.streaming_content)
+        
+        self.assertEqual(response.status_code, status, f"'{url_name}' answered {response.status_code}, expected {status}")
+        timed = SERVER_TIMING_QUERIES.search(response.get('Server-Timing', ''))
+        count = max(len(queries), int(timed.group(1)) if timed else 0)
+        if count > budget:
+            statements = '\n'.join(f"  {query['sql']}" for query in queries.captured_queries)
+            self.fail(
+                f"'{url_name}' ran {count} queries, over its budget of {budget}; "
+                f"those on the test's thread were:\n{statements}"
+            )
+        return response
+    
+    def assertAllWithinQueryBudgets(self, url_args=None, statuses=None):
+        """GET every dashboard URL.
+        
+        url_args maps URL names to their positional arguments, and statuses
+        maps them to the status expected when it is not 200.
+        """
+        url_args = url_args or {}
+        statuses = statuses or {}
+        for pattern in urlpatterns:
+            if pattern.pattern.converters and pattern.name not in url_args:
+                self.fail(f"Pass url_args['{pattern.name}'] so its query budget can be checked")
+            with self.subTest(url=pattern.name):
+                self.assertWithinQueryBudget(pattern.name, url_args.get(pattern.name, ()), status=statuses.get(pattern.name, 200))
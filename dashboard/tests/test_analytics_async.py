@@ -0,0 +1,72 @@
+import datetime
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from dashboard import views
+from dashboard.models import Account, AccountEntry, Transaction
+from dashboard.portfolio import Portfolio
+
+
+def failing_series(portfolio, start_date, end_date):
+    raise RuntimeError('series failed')
+
+
+def slow_series(portfolio, start_date, end_date):
+    time.sleep(0.5)
+    return {}
+
+
+class AsyncAnalyticsTests(TransactionTestCase):
+    """The series run on pool threads with their own connections, so the test rows must be committed"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        today = datetime.date.today()
+        for account_type in ('checking', 'loan'):
+            account = Account.objects.create(user=self.user, name=account_type.title(), account_type=account_type)
+            AccountEntry.objects.create(account=account, year=today.year, month=today.month, balance=Decimal('500.00'))
+            Transaction.objects.create(
+                user=self.user, account=account, amount=Decimal('40.00'), transaction_type='expense',
+                category='food', description='Groceries', date=today,
+            )
+        cache.clear()
+        self.client.force_login(self.user)
+    
+    def get_page(self):
+        response = self.client.get(reverse('dashboard:analytics_async'))
+        self.assertEqual(response.status_code, 200)
+        return response.context['embedded_series']
+    
+    def test_every_series_is_embedded(self):
+        embedded = self.get_page()
+        self.assertEqual(set(embedded), set(views.ANALYTICS_SERIES))
+        for name, (helper, args) in views.default_series_calls(Portfolio(self.user)).items():
+            with self.subTest(series=name):
+                self.assertEqual(embedded[name], helper(*args))
+    
+    def test_failing_series_is_skipped_and_logged(self):
+        with mock.patch.dict(views.ANALYTICS_SERIES, {'savings-rate': (failing_series, 6)}):
+            with self.assertLogs('dashboard.concurrency', 'ERROR') as logs:
+                embedded = self.get_page()
+        self.assertEqual(set(embedded), set(views.ANALYTICS_SERIES) - {'savings-rate'})
+        self.assertIn('savings-rate failed and was skipped', logs.output[0])
+    
+    @override_settings(ANALYTICS_SERIES_TIMEOUT=0.1)
+    def test_slow_series_is_skipped_and_logged(self):
+        with mock.patch.dict(views.ANALYTICS_SERIES, {'savings-rate': (slow_series, 6)}):
+            with self.assertLogs('dashboard.concurrency', 'WARNING') as logs:
+                embedded = self.get_page()
+        self.assertEqual(set(embedded), set(views.ANALYTICS_SERIES) - {'savings-rate'})
+        self.assertIn('savings-rate took longer than 0.1s and was skipped', logs.output[0])
+    
+    def test_anonymous_user_is_sent_to_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('dashboard:analytics_async'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('login', response['Location'])
@@ -0,0 +1,61 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+
+from dashboard.cache import version_key
+from dashboard.models import Account, Transaction, VersionStamp
+
+
+class ConditionalApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.account = Account.objects.create(user=cls.user, name='Checking', account_type='checking')
+    
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('dashboard:api_transactions')
+    
+    def get(self, etag=None, url=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url or self.url, **headers)
+    
+    def test_matching_etag_is_not_modified(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        
+        not_modified = self.get(response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+    
+    def test_etag_is_per_url(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(etag, reverse('dashboard:api_accounts')).status_code, 200)
+    
+    def test_write_changes_the_etag(self):
+        etag = self.get()['ETag']
+        Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('4.50'), transaction_type='expense',
+            category='food', description='Coffee', date=datetime.date.today(),
+        )
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['results']), 1)
+    
+    def test_version_change_in_another_process_changes_the_etag(self):
+        etag = self.get()['ETag']
+        # The job worker bumps the stored stamp without touching this process's cache
+        VersionStamp.objects.filter(key=version_key(self.user.pk)).update(version=F('version') + 1)
+        self.assertEqual(self.get(etag).status_code, 200)
+    
+    def test_other_users_etag_does_not_match(self):
+        etag = self.get()['ETag']
+        self.client.force_login(User.objects.create_user('bob', 'bob@example.com', 'password'))
+        self.assertEqual(self.get(etag).status_code, 200)
@@ -0,0 +1,107 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from dashboard.cache import bump_data_version, get_data_version, version_key
+from dashboard.models import Account, AccountEntry, Transaction, VersionStamp
+from dashboard.portfolio import Portfolio
+from dashboard.views import get_asset_allocation, get_savings_rate
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'dashboard-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedAnalyticsTests(TestCase):
+    """Analytics helpers are cached per user and data version, using the in-memory cache in place of Redis"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.account = Account.objects.create(user=cls.user, name='Checking', account_type='checking')
+        cls.today = datetime.date.today()
+        cls.start = cls.today - datetime.timedelta(days=90)
+        AccountEntry.objects.create(account=cls.account, year=cls.today.year, month=cls.today.month, balance=Decimal('1000.00'))
+        Transaction.objects.create(
+            user=cls.user, account=cls.account, amount=Decimal('500.00'), transaction_type='income',
+            category='salary', description='Salary', date=cls.today,
+        )
+    
+    def setUp(self):
+        cache.clear()
+    
+    def savings_rate(self, user=None):
+        return get_savings_rate(Portfolio(user or self.user), self.start, self.today)
+    
+    def add_expense(self, amount='100.00'):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal(amount), transaction_type='expense',
+            category='food', description='Groceries', date=self.today,
+        )
+    
+    def test_repeat_call_is_served_from_cache(self):
+        first = self.savings_rate()
+        # Only the data version is read
+        with self.assertNumQueries(1):
+            self.assertEqual(self.savings_rate(), first)
+    
+    def test_different_arguments_are_cached_separately(self):
+        self.savings_rate()
+        with self.assertNumQueries(2):
+            get_savings_rate(Portfolio(self.user), self.today, self.today)
+    
+    def test_bump_data_version_invalidates(self):
+        version = get_data_version(self.user.pk)
+        self.savings_rate()
+        bump_data_version(self.user.pk)
+        self.assertNotEqual(get_data_version(self.user.pk), version)
+        with self.assertNumQueries(2):
+            self.savings_rate()
+    
+    def test_version_change_in_another_process_invalidates(self):
+        self.assertEqual(get_asset_allocation(Portfolio(self.user))[0]['value'], 1000)
+        # Another process writes with its own cache; only the stored stamp is shared
+        AccountEntry.objects.filter(account=self.account).update(balance=Decimal('1500.00'))
+        VersionStamp.objects.filter(key=version_key(self.user.pk)).update(version=F('version') + 1)
+        self.assertEqual(get_asset_allocation(Portfolio(self.user))[0]['value'], 1500)
+    
+    def test_transaction_save_invalidates(self):
+        self.assertEqual(self.savings_rate()['total_expenses'], 0)
+        transaction = self.add_expense()
+        self.assertEqual(self.savings_rate()['total_expenses'], 100)
+        
+        transaction.amount = Decimal('250.00')
+        transaction.save()
+        self.assertEqual(self.savings_rate()['total_expenses'], 250)
+    
+    def test_transaction_delete_invalidates(self):
+        transaction = self.add_expense()
+        self.assertEqual(self.savings_rate()['total_expenses'], 100)
+        transaction.delete()
+        self.assertEqual(self.savings_rate()['total_expenses'], 0)
+    
+    def test_entry_save_invalidates(self):
+        self.assertEqual(get_asset_allocation(Portfolio(self.user))[0]['value'], 1000)
+        entry = AccountEntry.objects.get(account=self.account)
+        entry.balance = Decimal('1500.00')
+        entry.save()
+        self.assertEqual(get_asset_allocation(Portfolio(self.user))[0]['value'], 1500)
+    
+    def test_entry_delete_invalidates(self):
+        self.assertEqual(len(get_asset_allocation(Portfolio(self.user))), 1)
+        AccountEntry.objects.get(account=self.account).delete()
+        self.assertEqual(get_asset_allocation(Portfolio(self.user)), [])
+    
+    def test_users_have_separate_keys(self):
+        other = User.objects.create_user('bob', 'bob@example.com', 'password')
+        self.savings_rate()
+        self.assertEqual(self.savings_rate(other)['total_income'], 0)
+        
+        # Bob's writes leave Alice's cached results in place
+        bump_data_version(other.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.savings_rate()['total_income'], 500)
@@ -0,0 +1,103 @@
+import csv
+import datetime
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+from reportlab.pdfgen import canvas
+
+from dashboard import exports
+from dashboard.models import Account, Transaction
+
+
+FORMULA_DESCRIPTIONS = ['=HYPERLINK("http://example.com")', '+1+1', '-2+3', '@SUM(A1)', '\tTabbed', '\rReturn']
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.account = Account.objects.create(user=cls.user, name='=Checking', account_type='checking')
+        cls.today = datetime.date.today()
+    
+    def setUp(self):
+        self.client.force_login(self.user)
+    
+    def add_transactions(self, descriptions):
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, account=self.account, amount=Decimal('-4.50'), transaction_type='expense',
+                category='food', description=description, date=self.today,
+            )
+            for description in descriptions
+        ])
+    
+    def export(self, file_format):
+        response = self.client.get(reverse('dashboard:export_data', args=['transactions', file_format]))
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+    
+    def test_escape_formula(self):
+        for value in FORMULA_DESCRIPTIONS:
+            with self.subTest(value=value):
+                self.assertEqual(exports.escape_formula(value), "'" + value)
+        for value in ['Coffee', '', Decimal('-4.50'), -4.5, None, self.today]:
+            with self.subTest(value=value):
+                self.assertEqual(exports.escape_formula(value), value)
+    
+    def test_csv_cells_are_not_formulas(self):
+        self.add_transactions(FORMULA_DESCRIPTIONS)
+        header, *rows = csv.reader(io.StringIO(self.export('csv').decode(), newline=''))
+        self.assertEqual(header[4], 'Description')
+        self.assertCountEqual([row[4] for row in rows], ["'" + value for value in FORMULA_DESCRIPTIONS])
+        self.assertEqual({row[1] for row in rows}, {"'=Checking"})
+        # Numbers keep their sign
+        self.assertEqual({row[5] for row in rows}, {'-4.50'})
+    
+    def test_excel_cells_are_text(self):
+        self.add_transactions(FORMULA_DESCRIPTIONS)
+        sheet = load_workbook(io.BytesIO(self.export('excel'))).active
+        descriptions = [row[4] for row in sheet.iter_rows(min_row=2)]
+        self.assertEqual(len(descriptions), len(FORMULA_DESCRIPTIONS))
+        # Reading the XML back turns the '\r' cell's return into a newline, so only the quote is compared
+        self.assertEqual({cell.value[0] for cell in descriptions}, {"'"})
+        self.assertEqual({cell.data_type for cell in descriptions}, {'s'})
+    
+    def pdf_pages(self):
+        """The rows of each page's table, and any note that the report was cut short"""
+        pages, notes = [], []
+        table, draw_string = exports.Table, canvas.Canvas.drawString
+        
+        def record_table(data, **kwargs):
+            pages.append(data[1:])
+            return table(data, **kwargs)
+        
+        def record_string(pdf, x, y, text, *args, **kwargs):
+            if text.startswith('Only the first'):
+                notes.append(text)
+            return draw_string(pdf, x, y, text, *args, **kwargs)
+        
+        with mock.patch.object(exports, 'Table', record_table), mock.patch.object(canvas.Canvas, 'drawString', record_string):
+            self.assertTrue(self.export('pdf').startswith(b'%PDF'))
+        return pages, notes
+    
+    @mock.patch.object(exports, 'PDF_ROWS_PER_PAGE', 2)
+    @mock.patch.object(exports, 'PDF_MAX_ROWS', 5)
+    def test_pdf_stops_at_the_row_cap(self):
+        self.add_transactions([f'Purchase {number}' for number in range(7)])
+        pages, notes = self.pdf_pages()
+        self.assertEqual([len(rows) for rows in pages], [2, 2, 1])
+        self.assertEqual(len(notes), 1)
+        self.assertIn('Only the first 5 rows are included', notes[0])
+    
+    @mock.patch.object(exports, 'PDF_ROWS_PER_PAGE', 2)
+    @mock.patch.object(exports, 'PDF_MAX_ROWS', 5)
+    def test_pdf_at_the_row_cap_is_complete(self):
+        self.add_transactions([f'Purchase {number}' for number in range(5)])
+        pages, notes = self.pdf_pages()
+        self.assertEqual([len(rows) for rows in pages], [2, 2, 1])
+        self.assertEqual(notes, [])
@@ -0,0 +1,103 @@
+import datetime
+import io
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from dashboard.cache import get_data_version
+from dashboard.importers import ImportFormatError, TransactionImporter
+from dashboard.models import Account, AccountEntry, Transaction
+from dashboard.rollups import range_totals
+
+
+def statement(*rows, header='Date,Description,Amount,Balance'):
+    return io.StringIO('\n'.join([header, *rows]) + '\n')
+
+
+def ofx_statement(*transactions):
+    """An OFX 1.x body with one STMTTRN per (fitid, date, amount, name)"""
+    return io.StringIO(''.join(
+        f'<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>{day:%Y%m%d}<TRNAMT>{amount}<FITID>{fitid}<NAME>{name}</STMTTRN>'
+        for fitid, day, amount, name in transactions
+    ))
+
+
+class TransactionImporterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.account = Account.objects.create(user=cls.user, name='Checking', account_type='checking')
+        cls.today = datetime.date.today()
+        cls.day = cls.today.replace(day=1).isoformat()
+    
+    def import_rows(self, *rows, batch_size=1000, file_format='csv'):
+        return TransactionImporter(self.account, batch_size=batch_size).run(statement(*rows), file_format)
+    
+    def expenses(self):
+        return range_totals(self.user, self.today.replace(day=1), self.today)['expenses']
+    
+    def test_import_creates_transactions_and_refreshes_derived_data(self):
+        version = get_data_version(self.user.pk)
+        result = self.import_rows(f'{self.day},Coffee,-4.50,95.50', f'{self.day},Lunch,-12.00,83.50')
+        self.assertEqual((result.rows, result.created, result.duplicates, result.entries), (2, 2, 0, 1))
+        self.assertEqual(self.expenses(), Decimal('16.50'))
+        self.assertEqual(AccountEntry.objects.get(account=self.account).balance, Decimal('83.50'))
+        self.assertNotEqual(get_data_version(self.user.pk), version)
+    
+    def test_failure_part_way_refreshes_committed_batches(self):
+        version = get_data_version(self.user.pk)
+        rows = [f'{self.day},Purchase {number},-10.00,' for number in range(3)] + ['31/31/2024,Broken,-1.00,']
+        with self.assertRaises(ImportFormatError):
+            self.import_rows(*rows, batch_size=2)
+        
+        # The first batch was committed; the rollups and data version include it
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(self.expenses(), Decimal('20.00'))
+        self.assertNotEqual(get_data_version(self.user.pk), version)
+    
+    def test_failure_before_any_write_changes_nothing(self):
+        version = get_data_version(self.user.pk)
+        with self.assertRaises(ImportFormatError):
+            self.import_rows('31/31/2024,Broken,-1.00,')
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.assertEqual(get_data_version(self.user.pk), version)
+    
+    def test_reimport_skips_every_row(self):
+        rows = [f'{self.day},Coffee,-4.50,', f'{self.day},Lunch,-12.00,']
+        self.import_rows(*rows)
+        result = self.import_rows(*rows)
+        self.assertEqual((result.created, result.duplicates), (0, 2))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(self.expenses(), Decimal('16.50'))
+    
+    def test_identical_rows_on_one_day_are_separate_purchases(self):
+        result = self.import_rows(f'{self.day},Coffee,-4.50,', f'{self.day},Coffee,-4.50,')
+        self.assertEqual((result.created, result.duplicates), (2, 0))
+    
+    def test_repeated_row_within_a_file_is_imported_once(self):
+        other_day = (self.today.replace(day=1) + datetime.timedelta(days=1)).isoformat()
+        rows = [f'{self.day},Coffee,-4.50,', f'{other_day},Lunch,-12.00,', f'{self.day},Coffee,-4.50,']
+        for batch_size in (1000, 1):
+            with self.subTest(batch_size=batch_size):
+                Transaction.objects.filter(user=self.user).delete()
+                result = self.import_rows(*rows, batch_size=batch_size)
+                self.assertEqual((result.created, result.duplicates), (2, 1))
+                self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+    
+    def test_repeated_fitid_is_imported_once(self):
+        day = self.today.replace(day=1)
+        stream = ofx_statement(('T1', day, '-4.50', 'Coffee'), ('T2', day, '-12.00', 'Lunch'), ('T1', day, '-4.50', 'Coffee'))
+        result = TransactionImporter(self.account).run(stream, 'ofx')
+        self.assertEqual((result.rows, result.created, result.duplicates), (3, 2, 1))
+        self.assertEqual(self.expenses(), Decimal('16.50'))
+    
+    def test_import_hash_is_unique_per_user(self):
+        self.import_rows(f'{self.day},Coffee,-4.50,')
+        imported = Transaction.objects.get(user=self.user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Transaction.objects.create(
+                user=self.user, account=self.account, amount=imported.amount, transaction_type='expense',
+                category='other', description='Copy', date=imported.date, import_hash=imported.import_hash,
+            )
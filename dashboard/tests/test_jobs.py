@@ -0,0 +1,102 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from dashboard import jobs
+from dashboard.models import Job
+
+
+def broken_handler(job):
+    raise RuntimeError('worker crashed')
+
+
+def rejected_handler(job):
+    raise jobs.JobFailed('bad input')
+
+
+@override_settings(JOB_MAX_ATTEMPTS=3, JOB_RETRY_BACKOFF=30)
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+    
+    def enqueue(self, **fields):
+        job = jobs.enqueue(self.user, 'rebuild_snapshots')
+        Job.objects.filter(pk=job.pk).update(**fields)
+        return job
+    
+    def make_runnable(self, job):
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    
+    def test_claim_takes_the_oldest_runnable_job_once(self):
+        now = timezone.now()
+        later = self.enqueue(run_after=now - timedelta(minutes=1))
+        oldest = self.enqueue(run_after=now - timedelta(minutes=5))
+        self.enqueue(run_after=now + timedelta(minutes=5))
+        
+        job = jobs.claim_job()
+        self.assertEqual(job.pk, oldest.pk)
+        self.assertEqual((job.status, job.attempts), ('running', 1))
+        self.assertIsNone(jobs.claim_job(oldest.pk))
+        self.assertEqual(jobs.claim_job().pk, later.pk)
+        # The remaining job is not due yet
+        self.assertIsNone(jobs.claim_job())
+    
+    def test_claim_by_id_only_takes_that_job(self):
+        self.enqueue(run_after=timezone.now() - timedelta(minutes=5))
+        wanted = self.enqueue()
+        self.assertEqual(jobs.claim_job(wanted.pk).pk, wanted.pk)
+    
+    def test_success_records_the_result(self):
+        self.enqueue()
+        job = jobs.claim_job()
+        jobs.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.error), ('succeeded', 100, ''))
+        self.assertEqual(set(job.result), {'months', 'rollups'})
+        self.assertIsNotNone(job.finished_at)
+    
+    @mock.patch.dict(jobs.JOB_HANDLERS, {'rebuild_snapshots': broken_handler})
+    def test_errors_are_retried_with_backoff_until_the_last_attempt(self):
+        job = self.enqueue()
+        for attempt, delay in [(1, 30), (2, 60)]:
+            with self.subTest(attempt=attempt):
+                claimed = jobs.claim_job()
+                self.assertEqual(claimed.attempts, attempt)
+                before = timezone.now()
+                with self.assertLogs('dashboard.jobs', 'ERROR'):
+                    jobs.run_job(claimed)
+                job.refresh_from_db()
+                self.assertEqual(job.status, 'queued')
+                self.assertIn('RuntimeError: worker crashed', job.error)
+                self.assertGreaterEqual(job.run_after, before + timedelta(seconds=delay))
+                self.assertLessEqual(job.run_after, timezone.now() + timedelta(seconds=delay))
+                # Not claimable again until the backoff has passed
+                self.assertIsNone(jobs.claim_job())
+                self.make_runnable(job)
+        
+        with self.assertLogs('dashboard.jobs', 'ERROR'):
+            jobs.run_job(jobs.claim_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+        self.assertIsNotNone(job.finished_at)
+    
+    @mock.patch.dict(jobs.JOB_HANDLERS, {'rebuild_snapshots': rejected_handler})
+    def test_job_failed_is_not_retried(self):
+        job = self.enqueue()
+        jobs.run_job(jobs.claim_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), ('failed', 1, 'bad input'))
+    
+    def test_stale_jobs_are_requeued_until_their_attempts_run_out(self):
+        stale = timezone.now() - timedelta(hours=1)
+        requeued = self.enqueue(status='running', attempts=1, updated_at=stale)
+        exhausted = self.enqueue(status='running', attempts=3, updated_at=stale)
+        self.enqueue(status='running', attempts=1)
+        
+        self.assertEqual(jobs.requeue_stale_jobs(600), 2)
+        self.assertEqual(Job.objects.get(pk=requeued.pk).status, 'queued')
+        self.assertEqual(Job.objects.get(pk=exhausted.pk).status, 'failed')
@@ -0,0 +1,89 @@
+import base64
+import datetime
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from dashboard.models import Account, Transaction
+from dashboard.pagination import InvalidCursor, KeysetPaginator
+from dashboard.views import TRANSACTION_PAGE_KEYS
+
+
+def cursor_for(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+MALFORMED_CURSORS = [
+    'not base64!',
+    cursor_for({'date': '2024-01-01'}),
+    cursor_for(['2024-01-01', '2024-01-01T00:00:00+00:00']),
+    cursor_for([[1], {}, 1]),
+    cursor_for([None, None, None]),
+    cursor_for(['2024-13-45', '2024-01-01T00:00:00+00:00', 1]),
+    cursor_for(['2024-01-01', '2024-01-01T00:00:00+00:00', 'x']),
+    cursor_for(['2024-01-01', '2024-01-01T00:00:00+00:00', 10 ** 30]),
+]
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.account = Account.objects.create(user=cls.user, name='Checking', account_type='checking')
+        today = datetime.date.today()
+        # Several rows share a date, so the later keys break ties
+        for number in range(7):
+            Transaction.objects.create(
+                user=cls.user, account=cls.account, amount=Decimal('1.00'), transaction_type='expense',
+                category='food', description=f'Purchase {number}', date=today - datetime.timedelta(days=number // 3),
+            )
+        cls.ordered = list(
+            Transaction.objects.filter(user=cls.user).order_by(*(f'-{key}' for key in TRANSACTION_PAGE_KEYS)).values_list('pk', flat=True)
+        )
+    
+    def setUp(self):
+        self.paginator = KeysetPaginator(Transaction.objects.filter(user=self.user), TRANSACTION_PAGE_KEYS, per_page=3)
+    
+    def ids(self, page):
+        return [transaction.pk for transaction in page]
+    
+    def test_cursor_round_trip(self):
+        transaction = Transaction.objects.get(pk=self.ordered[0])
+        self.assertEqual(
+            self.paginator.decode_cursor(self.paginator.encode_cursor(transaction)),
+            [transaction.date, transaction.created_at, transaction.pk],
+        )
+    
+    def test_pages_forward_and_back(self):
+        pages = [self.paginator.page()]
+        while pages[-1].has_next:
+            pages.append(self.paginator.page(after=pages[-1].next_cursor))
+        self.assertEqual([self.ids(page) for page in pages], [self.ordered[0:3], self.ordered[3:6], self.ordered[6:]])
+        self.assertFalse(pages[0].has_previous)
+        
+        previous = self.paginator.page(before=pages[-1].previous_cursor)
+        self.assertEqual(self.ids(previous), self.ordered[3:6])
+        self.assertTrue(previous.has_previous)
+        self.assertEqual(self.ids(self.paginator.page(before=previous.previous_cursor)), self.ordered[0:3])
+    
+    def test_malformed_cursors_are_invalid(self):
+        for cursor in MALFORMED_CURSORS:
+            for direction in ('after', 'before'):
+                with self.subTest(cursor=cursor, direction=direction):
+                    with self.assertRaises(InvalidCursor):
+                        self.paginator.page(**{direction: cursor})
+    
+    def test_malformed_cursors_are_not_found(self):
+        self.client.force_login(self.user)
+        urls = [
+            reverse('dashboard:transactions_list'),
+            reverse('dashboard:api_transactions'),
+            reverse('dashboard:account_detail', args=[self.account.pk]),
+        ]
+        for url in urls:
+            for cursor in MALFORMED_CURSORS:
+                with self.subTest(url=url, cursor=cursor):
+                    self.assertEqual(self.client.get(url, {'after': cursor}).status_code, 404)
@@ -0,0 +1,129 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+
+from dashboard.jobs import enqueue, run_job
+from dashboard.models import Account, AccountEntry, Transaction
+from dashboard.performance import QUERY_BUDGETS
+from dashboard.testing import QueryBudgetMixin
+from dashboard.views import ANALYTICS_SERIES
+
+
+def create_history(user, today):
+    """Six accounts with a year of monthly balances and transactions"""
+    account_types = ['checking', 'savings', 'investment', 'credit', 'loan', 'other']
+    accounts = [
+        Account.objects.create(user=user, name=f'Account {index}', account_type=account_type)
+        for index, account_type in enumerate(account_types)
+    ]
+    for index, account in enumerate(accounts):
+        for months_ago in range(12):
+            year, month = divmod(today.year * 12 + today.month - 1 - months_ago, 12)
+            AccountEntry.objects.create(account=account, year=year, month=month + 1, balance=Decimal(1000 * (index + 1) + months_ago))
+        for days_ago in range(0, 360, 30):
+            Transaction.objects.create(
+                user=user, account=account, amount=Decimal('25.00'),
+                transaction_type='income' if days_ago % 60 else 'expense',
+                category='salary' if days_ago % 60 else 'food', description=f'Payee {days_ago}',
+                date=today - datetime.timedelta(days=days_ago),
+            )
+    return accounts
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Every view in QUERY_BUDGETS stays within its budget for a user with a year of data"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.today = datetime.date.today()
+        cls.accounts = create_history(cls.user, cls.today)
+        
+        cls.job = enqueue(cls.user, 'export', {'dataset': 'transactions', 'file_format': 'csv'})
+        run_job(cls.job)
+        cls.job.refresh_from_db()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.job.output_file.delete(save=False)
+        super().tearDownClass()
+    
+    def setUp(self):
+        self.client.force_login(self.user)
+    
+    def budget_requests(self):
+        """(url name, args, keyword arguments for assertWithinQueryBudget) for every budgeted view"""
+        account = self.accounts[0]
+        balances = {str(each.pk): '1234.56' for each in self.accounts}
+        requests = [
+            # Signed-in users are sent on to the dashboard
+            ('landing', (), {'status': 302}),
+            ('dashboard', (), {}),
+            # The test client is WSGI, where the stream is declined
+            ('live_updates', (), {'status': 204}),
+            ('analytics', (), {}),
+            ('accounts_list', (), {}),
+            ('account_detail', (account.pk,), {}),
+            ('month_close', (), {}),
+            ('month_close', (), {
+                'method': 'post',
+                'data': {'year': self.today.year, 'month': self.today.month, **{f'balance_{pk}': balance for pk, balance in balances.items()}},
+                'status': 302,
+            }),
+            ('transactions_list', (), {}),
+            ('import_transactions', (), {}),
+            ('export_data', ('transactions', 'csv'), {}),
+            ('job_detail', (self.job.pk,), {}),
+            ('job_download', (self.job.pk,), {}),
+            ('api_accounts', (), {}),
+            ('api_account_entries', (account.pk,), {}),
+            ('api_month_close', (), {
+                'method': 'post',
+                'data': {'year': self.today.year, 'month': self.today.month, 'balances': balances},
+                'content_type': 'application/json',
+            }),
+            ('api_transactions', (), {}),
+            ('api_jobs', (), {}),
+            ('api_job_status', (self.job.pk,), {}),
+            ('settings', (), {}),
+            ('terms_of_service', (), {}),
+            ('privacy_policy', (), {}),
+            ('signup_disabled', (), {}),
+        ]
+        requests += [('api_analytics_series', (series,), {}) for series in ANALYTICS_SERIES]
+        return requests
+    
+    def test_every_budget_is_checked(self):
+        checked = {url_name for url_name, args, options in self.budget_requests()}
+        # Checked by AsyncAnalyticsQueryBudgetTests below
+        checked.add('analytics_async')
+        self.assertEqual(checked, set(QUERY_BUDGETS))
+    
+    def test_views_within_query_budgets(self):
+        for url_name, args, options in self.budget_requests():
+            with self.subTest(url=url_name, args=args, method=options.get('method', 'get')):
+                # Results cached by an earlier view would hide this one's queries
+                cache.clear()
+                self.assertWithinQueryBudget(url_name, args, **options)
+
+
+class AsyncAnalyticsQueryBudgetTests(QueryBudgetMixin, TransactionTestCase):
+    """The async analytics page computes its series on pool threads with their own connections.
+    
+    Inside a TestCase transaction those connections cannot read the test's
+    rows, so every series would be skipped and the budget measured on an
+    empty page. Here the rows are committed and the series really run.
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        create_history(self.user, datetime.date.today())
+        cache.clear()
+        self.client.force_login(self.user)
+    
+    def test_within_query_budget_with_every_series(self):
+        response = self.assertWithinQueryBudget('analytics_async')
+        self.assertEqual(set(response.context['embedded_series']), set(ANALYTICS_SERIES))
@@ -0,0 +1,91 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from dashboard.models import Account, Transaction, TransactionRollup
+from dashboard.rollups import category_totals, period_totals, range_totals, rebuild_rollups
+
+
+def rollup_rows(user):
+    return set(TransactionRollup.objects.filter(user=user).values_list(
+        'tier', 'year', 'month', 'transaction_type', 'category', 'total', 'count'
+    ))
+
+
+class RollupRefreshTests(TestCase):
+    """Writes keep every rollup tier equal to a rebuild from the transactions"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.account = Account.objects.create(user=cls.user, name='Checking', account_type='checking')
+        cls.other_account = Account.objects.create(user=cls.user, name='Card', account_type='credit')
+        cls.year_start = datetime.date(2023, 1, 1)
+        cls.year_end = datetime.date(2023, 12, 31)
+    
+    def add(self, amount, day, transaction_type='expense', category='food', account=None):
+        return Transaction.objects.create(
+            user=self.user, account=account or self.account, amount=Decimal(amount), transaction_type=transaction_type,
+            category=category, description='Purchase', date=day,
+        )
+    
+    def assertMatchesRebuild(self):
+        rows = rollup_rows(self.user)
+        rebuild_rollups(self.user.pk)
+        self.assertEqual(rows, rollup_rows(self.user))
+    
+    def quarterly_expenses(self):
+        return [
+            (row['period'], row['expenses'])
+            for row in period_totals(self.user, self.year_start, self.year_end, 'quarter')
+        ]
+    
+    def test_amount_edit(self):
+        transaction = self.add('40.00', datetime.date(2023, 2, 10))
+        self.add('10.00', datetime.date(2023, 3, 5))
+        transaction.amount = Decimal('25.00')
+        transaction.save()
+        self.assertEqual(self.quarterly_expenses(), [((2023, 1), Decimal('35.00'))])
+        self.assertMatchesRebuild()
+    
+    def test_date_edit_moves_the_totals_between_periods(self):
+        transaction = self.add('40.00', datetime.date(2023, 2, 10))
+        self.add('10.00', datetime.date(2023, 2, 12))
+        transaction.date = datetime.date(2024, 1, 3)
+        transaction.save()
+        self.assertEqual(self.quarterly_expenses(), [((2023, 1), Decimal('10.00'))])
+        self.assertEqual(range_totals(self.user, datetime.date(2024, 1, 1), datetime.date(2024, 12, 31))['expenses'], Decimal('40.00'))
+        self.assertMatchesRebuild()
+    
+    def test_type_and_category_edit(self):
+        transaction = self.add('40.00', datetime.date(2023, 5, 10))
+        transaction.transaction_type = 'income'
+        transaction.category = 'salary'
+        transaction.save()
+        totals = range_totals(self.user, self.year_start, self.year_end)
+        self.assertEqual((totals['income'], totals['expenses']), (Decimal('40.00'), Decimal('0.00')))
+        self.assertEqual(category_totals(self.user, self.year_start, self.year_end), [])
+        self.assertMatchesRebuild()
+    
+    def test_delete(self):
+        self.add('40.00', datetime.date(2023, 2, 10), category='shopping')
+        transaction = self.add('10.00', datetime.date(2023, 11, 5))
+        transaction.delete()
+        self.assertEqual(self.quarterly_expenses(), [((2023, 1), Decimal('40.00'))])
+        self.assertEqual(category_totals(self.user, self.year_start, self.year_end), [('shopping', Decimal('40.00'))])
+        self.assertMatchesRebuild()
+    
+    def test_deleting_the_last_transaction_of_a_period_removes_its_rows(self):
+        self.add('40.00', datetime.date(2023, 2, 10))
+        self.add('10.00', datetime.date(2023, 11, 5)).delete()
+        self.assertFalse(TransactionRollup.objects.filter(user=self.user, year=2023, month__gte=10).exists())
+        self.assertMatchesRebuild()
+    
+    def test_account_delete(self):
+        self.add('40.00', datetime.date(2023, 2, 10))
+        self.add('10.00', datetime.date(2023, 2, 11), account=self.other_account)
+        self.other_account.delete()
+        self.assertEqual(self.quarterly_expenses(), [((2023, 1), Decimal('40.00'))])
+        self.assertMatchesRebuild()
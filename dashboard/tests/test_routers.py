@@ -0,0 +1,126 @@
+import datetime
+import os
+import tempfile
+import time
+import warnings
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from dashboard.models import Account, Transaction
+from dashboard.routers import REPLICA_ALIAS, STICKY_SESSION_KEY, primary_reads, replica_reads
+
+
+class ReplicaTestCase(TransactionTestCase):
+    """Runs with DATABASES['replica'] pointing at a second SQLite database.
+    
+    The replica only changes when ``sync_replica`` copies the primary into it,
+    so reads that reach it see the data as of the last sync, like a lagging replica.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        # Added after the test runner has set up its databases, since the
+        # replica is a plain copy of the primary rather than a test database
+        super().setUpClass()
+        handle, cls.replica_name = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        replica = {**settings.DATABASES['default'], 'NAME': cls.replica_name, 'TEST': {'NAME': cls.replica_name}}
+        cls.databases_override = override_settings(DATABASES={**settings.DATABASES, REPLICA_ALIAS: replica})
+        with warnings.catch_warnings():
+            # Only the new alias is added; the existing connections are untouched
+            warnings.simplefilter('ignore')
+            cls.databases_override.enable()
+        connections.settings[REPLICA_ALIAS] = replica
+    
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        cls.databases_override.disable()
+        os.remove(cls.replica_name)
+        super().tearDownClass()
+    
+    def sync_replica(self):
+        """Copy the primary's current rows to the replica, as if it had caught up"""
+        for alias in ('default', REPLICA_ALIAS):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(connections[REPLICA_ALIAS].connection)
+    
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        self.account = Account.objects.create(user=self.user, name='Checking', account_type='checking')
+        self.add_transaction('Salary')
+        self.sync_replica()
+        self.client.force_login(self.user)
+    
+    def add_transaction(self, description):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal('100.00'), transaction_type='income',
+            category='salary', description=description, date=datetime.date.today(),
+        )
+
+
+class ReplicaRouterTests(ReplicaTestCase):
+    def test_reads_outside_replica_blocks_use_primary(self):
+        self.add_transaction('Bonus')
+        self.assertEqual(Transaction.objects.count(), 2)
+    
+    def test_replica_reads_use_replica(self):
+        self.add_transaction('Bonus')
+        with replica_reads():
+            self.assertEqual(Transaction.objects.count(), 1)
+            self.assertEqual(Transaction.objects.db, REPLICA_ALIAS)
+    
+    def test_writes_inside_replica_reads_use_primary(self):
+        with replica_reads():
+            transaction = self.add_transaction('Bonus')
+        self.assertEqual(transaction._state.db, 'default')
+        self.assertEqual(Transaction.objects.using('default').count(), 2)
+        self.assertEqual(Transaction.objects.using(REPLICA_ALIAS).count(), 1)
+    
+    def test_primary_reads_override_replica_reads(self):
+        self.add_transaction('Bonus')
+        with replica_reads():
+            with primary_reads():
+                self.assertEqual(Transaction.objects.count(), 2)
+            self.assertEqual(Transaction.objects.count(), 1)
+    
+    def test_replica_view_reads_from_replica(self):
+        self.add_transaction('Bonus')
+        response = self.client.get(reverse('dashboard:transactions_list'))
+        self.assertContains(response, 'Salary')
+        self.assertNotContains(response, 'Bonus')
+
+
+class StickyPrimaryMiddlewareTests(ReplicaTestCase):
+    def close_month(self):
+        today = datetime.date.today()
+        return self.client.post(reverse('dashboard:month_close'), {
+            'year': today.year, 'month': today.month, f'balance_{self.account.pk}': '2500.00',
+        })
+    
+    def test_write_pins_reads_to_primary(self):
+        response = self.close_month()
+        self.assertRedirects(response, reverse('dashboard:accounts_list'), fetch_redirect_response=False)
+        self.assertGreater(self.client.session[STICKY_SESSION_KEY], time.time())
+        
+        # The replica has not caught up, but this user's reads now skip it
+        self.add_transaction('Bonus')
+        self.assertContains(self.client.get(reverse('dashboard:transactions_list')), 'Bonus')
+    
+    def test_reads_return_to_replica_after_sticky_period(self):
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            self.close_month()
+        self.add_transaction('Bonus')
+        self.assertNotContains(self.client.get(reverse('dashboard:transactions_list')), 'Bonus')
+    
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post(reverse('dashboard:api_month_close'), {'year': 2000, 'month': 13}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(STICKY_SESSION_KEY, self.client.session)
@@ -0,0 +1,50 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from dashboard import signals
+from dashboard.cache import get_data_version
+from dashboard.models import Account, AccountEntry, NetWorthSnapshot
+
+
+class AccountSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.account = Account.objects.create(user=cls.user, name='Savings', account_type='savings')
+        today = datetime.date.today()
+        cls.period = {'year': today.year, 'month': today.month}
+        AccountEntry.objects.create(account=cls.account, balance=Decimal('800.00'), **cls.period)
+    
+    def setUp(self):
+        patcher = mock.patch.object(signals, 'publish_changes')
+        self.publish_changes = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def snapshot(self):
+        return NetWorthSnapshot.objects.get(user=self.user, **self.period)
+    
+    def test_rename_skips_the_rebuild_and_publishes(self):
+        version = get_data_version(self.user.pk)
+        self.account.name = 'Rainy day'
+        with mock.patch.object(signals, 'rebuild_snapshots') as rebuild_snapshots:
+            self.account.save()
+        rebuild_snapshots.assert_not_called()
+        self.publish_changes.assert_called_once_with(self.user.pk, account_ids=[self.account.pk])
+        self.assertNotEqual(get_data_version(self.user.pk), version)
+    
+    def test_deactivation_rebuilds_snapshots_and_publishes(self):
+        self.assertEqual(self.snapshot().total_assets, Decimal('800.00'))
+        self.account.is_active = False
+        self.account.save()
+        self.assertEqual(self.snapshot().total_assets, Decimal('0.00'))
+        self.publish_changes.assert_called_once_with(self.user.pk, account_ids=[self.account.pk])
+    
+    def test_type_change_rebuilds_snapshots(self):
+        self.account.account_type = 'loan'
+        self.account.save()
+        snapshot = self.snapshot()
+        self.assertEqual((snapshot.total_assets, snapshot.total_liabilities), (Decimal('0.00'), Decimal('800.00')))
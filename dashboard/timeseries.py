@@ -0,0 +1,185 @@
+import calendar
+from array import array
+from datetime import date
+from itertools import groupby
+from operator import mul
+
+from django.db.models import Q
+
+from .balances import LIABILITY_ACCOUNT_TYPES
+from .fx import conversion_factors
+from .models import AccountEntry
+
+
+def month_index(year, month):
+    """Number of months since year 0 for a year/month pair"""
+    return year * 12 + month - 1
+
+
+def month_from_index(index):
+    """Inverse of month_index"""
+    return index // 12, index % 12 + 1
+
+
+def month_range(start_date, end_date):
+    """List (year, month) pairs from start_date's month through end_date's month"""
+    first = month_index(start_date.year, start_date.month)
+    last = month_index(end_date.year, end_date.month)
+    return [month_from_index(index) for index in range(first, last + 1)]
+
+
+# Months in each period an analytics series can be grouped by
+GRANULARITIES = {
+    'month': 1,
+    'quarter': 3,
+    'year': 12,
+}
+
+
+def period_start(year, month, granularity):
+    """First (year, month) of the month, quarter or year containing year/month"""
+    size = GRANULARITIES[granularity]
+    return year, (month - 1) // size * size + 1
+
+
+def period_end(year, month, granularity):
+    """Last (year, month) of the month, quarter or year containing year/month"""
+    return month_from_index(month_index(*period_start(year, month, granularity)) + GRANULARITIES[granularity] - 1)
+
+
+def period_label(year, month, granularity):
+    """'2024-05', '2024-Q2' or '2024' for the period containing year/month"""
+    if granularity == 'year':
+        return f'{year:04d}'
+    if granularity == 'quarter':
+        return f'{year:04d}-Q{(month - 1) // 3 + 1}'
+    return f'{year:04d}-{month:02d}'
+
+
+def calendar_range(end_date, months):
+    """(start_date, end_date) covering ``months`` whole calendar months up to end_date's month"""
+    start = month_from_index(month_index(end_date.year, end_date.month) - months + 1)
+    return date(*start, 1), end_date
+
+
+def align_range(start_date, end_date, granularity):
+    """Widen a date range to whole periods, from its first period's first day to its last period's last day"""
+    first = period_start(start_date.year, start_date.month, granularity)
+    last = period_end(end_date.year, end_date.month, granularity)
+    return date(*first, 1), date(*last, calendar.monthrange(*last)[1])
+
+
+class BalanceMatrix:
+    """Account x month grid of balances with the last known balance carried forward.
+    
+    Rows are accounts and columns are consecutive months. Values are kept in a
+    flat ``array('d')`` so per-month totals never touch model instances.
+    ``accounts`` holds an (id, account_type, asset_type, currency) tuple per row.
+    """
+    
+    def __init__(self, months, accounts):
+        self.months = months
+        self.accounts = accounts
+        self.values = array('d', bytes(8 * len(accounts) * len(months)))
+    
+    @classmethod
+    def for_user(cls, user, start_date, end_date):
+        """Load every entry up to end_date for the user's active accounts in one query"""
+        months = month_range(start_date, end_date)
+        first = month_index(start_date.year, start_date.month)
+        
+        rows = AccountEntry.objects.filter(
+            Q(year__lt=end_date.year) | Q(year=end_date.year, month__lte=end_date.month),
+            account__user=user,
+            account__is_active=True,
+        ).order_by('account_id', 'year', 'month').values_list(
+            'account_id', 'account__account_type', 'account__asset_type', 'account__currency', 'year', 'month', 'balance'
+        )
+        
+        accounts = []
+        histories = []
+        for account, entries in groupby(rows, key=lambda row: row[:4]):
+            accounts.append(account)
+            histories.append([(month_index(year, month) - first, float(balance)) for *_, year, month, balance in entries])
+        
+        matrix = cls(months, accounts)
+        for row, history in enumerate(histories):
+            matrix.fill_row(row, history)
+        return matrix
+    
+    def fill_row(self, row, history):
+        """Write a sorted (column, balance) history into a row, carrying balances forward"""
+        width = len(self.months)
+        offset = row * width
+        current = 0.0
+        position = 0
+        
+        for column in range(width):
+            while position < len(history) and history[position][0] <= column:
+                current = history[position][1]
+                position += 1
+            self.values[offset + column] = current
+    
+    def convert(self, currency):
+        """Convert every row to ``currency`` in place with month-end exchange rates.
+        
+        Rows are grouped by their account's currency so each currency's
+        per-month factors are built once and applied to whole rows.
+        """
+        rows_by_currency = {}
+        for row, (account_id, account_type, asset_type, account_currency) in enumerate(self.accounts):
+            if account_currency != currency:
+                rows_by_currency.setdefault(account_currency, []).append(row)
+        
+        width = len(self.months)
+        for source, rows in rows_by_currency.items():
+            factors = conversion_factors(source, currency, self.months)
+            for row in rows:
+                self.values[row * width:(row + 1) * width] = array('d', map(mul, self.row(row), factors))
+        return self
+    
+    def row(self, row):
+        """Balances for one account across every month"""
+        width = len(self.months)
+        return self.values[row * width:(row + 1) * width]
+    
+    def totals(self):
+        """Per-month assets, liabilities and net worth"""
+        width = len(self.months)
+        assets = array('d', bytes(8 * width))
+        liabilities = array('d', bytes(8 * width))
+        
+        for row, (account_id, account_type, asset_type, currency) in enumerate(self.accounts):
+            target = liabilities if account_type in LIABILITY_ACCOUNT_TYPES else assets
+            balances = self.row(row)
+            if target is liabilities:
+                balances = map(abs, balances)
+            for column, balance in enumerate(balances):
+                target[column] += balance
+        
+        return [
+            {
+                'date': f'{year:04d}-{month:02d}',
+                'net_worth': round(assets[column] - liabilities[column], 2),
+                'assets': round(assets[column], 2),
+                'liabilities': round(liabilities[column], 2),
+            }
+            for column, (year, month) in enumerate(self.months)
+        ]
+    
+    def breakdown(self):
+        """Per-month asset balances grouped by asset type"""
+        width = len(self.months)
+        by_type = {}
+        
+        for row, (account_id, account_type, asset_type, currency) in enumerate(self.accounts):
+            if account_type in LIABILITY_ACCOUNT_TYPES:
+                continue
+            totals = by_type.setdefault(asset_type, array('d', bytes(8 * width)))
+            for column, balance in enumerate(self.row(row)):
+                totals[column] += balance
+        
+        return [
+            {asset_type: round(totals[column], 2) for asset_type, totals in by_type.items() if totals[column]}
+            for column in range(width)
+        ]
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'dashboard'
 
@@ -9,16 +9,36 @@ urlpatterns = [
     
     # Main dashboard
     path('', views.dashboard, name='dashboard'),
+    path('live/', views.live_updates, name='live_updates'),
     
     # Analytics page
     path('analytics/', views.analytics, name='analytics'),
+    path('analytics/async/', views.analytics_async, name='analytics_async'),
     
     # Account URLs
     path('accounts/', views.accounts_list, name='accounts_list'),
     path('accounts/<int:account_id>/', views.account_detail, name='account_detail'),
+    path('accounts/close-month/', views.month_close, name='month_close'),
     
     # Transaction URLs
     path('transactions/', views.transactions_list, name='transactions_list'),
+    path('transactions/import/', views.import_transactions, name='import_transactions'),
+    
+    # Export URLs
+    path('export/<slug:dataset>/<slug:file_format>/', views.export_data, name='export_data'),
+    
+    # Background job URLs
+    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/download/', views.job_download, name='job_download'),
+    
+    # API URLs
+    path('api/accounts/', api.account_list, name='api_accounts'),
+    path('api/accounts/<int:account_id>/entries/', api.account_entries, name='api_account_entries'),
+    path('api/entries/month-close/', api.month_close, name='api_month_close'),
+    path('api/transactions/', api.transaction_list, name='api_transactions'),
+    path('api/analytics/<slug:series>/', api.analytics_series, name='api_analytics_series'),
+    path('api/jobs/', api.job_list, name='api_jobs'),
+    path('api/jobs/<int:job_id>/', api.job_status, name='api_job_status'),
     
     # Settings URLs
     path('settings/', views.settings, name='settings'),
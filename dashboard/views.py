@@ -1,18 +1,45 @@
+from django.conf import settings as django_settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, JsonResponse, HttpResponse, HttpResponseForbidden, Http404, StreamingHttpResponse
 from django.db.models import Sum, Q, Count, Avg
 from django.db import models
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.contrib.auth.forms import UserChangeForm
 from django.contrib.auth.models import User
+from users.models import Profile
 from django.template.loader import render_to_string
 import json
 from decimal import Decimal
-from .models import Account, Transaction, AccountEntry
+from .models import Account, Transaction, AccountEntry, Job
+from .balances import BalanceSnapshot
+from .cache import cached_analytics
+from .colors import CATEGORY_COLORS, OTHER_COLOR, chart_color
+from .concurrency import gather_with_timeouts
+from .exports import DATASETS as EXPORT_DATASETS, EXPORT_FORMATS, export_response
+from .entries import close_month
+from .events import event_stream
+from .forms import MonthCloseForm, ProfileForm, TransactionFilterForm, TransactionImportForm
+from .importers import ImportFormatError, TransactionImporter, open_text
+from .jobs import enqueue
+from .pagination import InvalidCursor, KeysetPaginator
+from .portfolio import Portfolio
+from .rollups import category_totals, period_totals, range_totals
+from .routers import use_replica
+from .snapshots import net_worth_series
+from .spending import category_breakdown
+from .stats import with_stats
+from .timeseries import calendar_range
+
+
+# Matches Transaction.Meta.ordering, with id as the tie-breaker
+TRANSACTION_PAGE_KEYS = ('date', 'created_at', 'id')
 
 
 def landing_page(request):
@@ -28,35 +55,30 @@ def signup_disabled(request):
 
 
 @login_required
+@use_replica
 def dashboard(request):
     """Main dashboard view"""
     user = request.user
     
-    # Get user's accounts
-    accounts = Account.objects.filter(user=user, is_active=True)
+    # Resolve every account's latest balance in one query
+    snapshot = BalanceSnapshot.for_user(user)
+    accounts = snapshot.accounts
     
     # Calculate current net worth
-    total_assets = 0
-    total_liabilities = 0
-    
-    for account in accounts:
-        balance = account.get_latest_balance()
-        if account.account_type in ['loan', 'credit']:
-            total_liabilities += abs(balance)
-        else:
-            total_assets += balance
-    
-    net_worth = total_assets - total_liabilities
+    total_assets = snapshot.total_assets
+    total_liabilities = snapshot.total_liabilities
+    net_worth = snapshot.net_worth
     
     # Get recent transactions
-    recent_transactions = Transaction.objects.filter(user=user).order_by('-date')[:10]
+    recent_transactions = Transaction.objects.filter(user=user).select_related('account').order_by('-date')[:10]
     
     # Get account balances for chart
     account_balances = []
     for account in accounts:
-        balance = account.get_latest_balance()
+        balance = account.converted_balance
         if balance != 0:
             account_balances.append({
+                'id': account.pk,
                 'name': account.name,
                 'balance': float(balance),
                 'type': account.account_type,
@@ -65,6 +87,7 @@ def dashboard(request):
     
     context = {
         'net_worth': net_worth,
+        'currency': snapshot.currency,
         'total_assets': total_assets,
         'total_liabilities': total_liabilities,
         'accounts': accounts,
@@ -75,266 +98,193 @@ def dashboard(request):
     return render(request, 'dashboard/dashboard.html', context)
 
 
-@login_required
-def analytics(request):
-    """Analytics page with detailed financial insights"""
-    user = request.user
-    
-    # Get date range (last 12 months by default)
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=365)
-    
-    # Get user's accounts
-    accounts = Account.objects.filter(user=user, is_active=True)
-    
-    # Net Worth Trends (last 12 months)
-    net_worth_data = get_net_worth_trends(user, start_date, end_date)
-    
-    # Asset Allocation
-    asset_allocation = get_asset_allocation(user)
-    
-    # Income vs Expenses (last 6 months)
-    income_expenses = get_income_expenses(user, 6)
-    
-    # Spending by Category
-    spending_by_category = get_spending_by_category(user, 6)
+async def live_updates(request):
+    """Server-sent events stream of changes to the user's data, for the open dashboard.
     
-    # Account Performance
-    account_performance = get_account_performance(user)
+    Streams need an ASGI server (backend.asgi). Under WSGI each one would hold
+    a worker for its whole life, so the view answers 204, which tells the
+    browser not to reconnect, and the dashboard stays static.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return HttpResponseForbidden()
     
-    # Monthly Savings Rate
-    savings_rate = get_savings_rate(user, 6)
-    
-    # Financial Ratios
-    financial_ratios = get_financial_ratios(user)
-    
-    # Recent Activity
-    recent_activity = get_recent_activity(user)
-    
-    context = {
-        'net_worth_data': json.dumps(net_worth_data),
-        'asset_allocation': json.dumps(asset_allocation),
-        'income_expenses': json.dumps(income_expenses),
-        'spending_by_category': json.dumps(spending_by_category),
-        'account_performance': json.dumps(account_performance),
-        'savings_rate': json.dumps(savings_rate),
-        'financial_ratios': financial_ratios,
-        'recent_activity': recent_activity,
-        'accounts': accounts,
+    response = StreamingHttpResponse(event_stream(request.user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def default_range(months):
+    """(start_date, end_date) covering the last ``months`` calendar months, including this one"""
+    return calendar_range(timezone.now().date(), months)
+
+
+def default_series_calls(portfolio):
+    """Each analytics series' helper and arguments for its default range"""
+    return {
+        name: (helper, (portfolio,) if months is None else (portfolio, *default_range(months)))
+        for name, (helper, months) in ANALYTICS_SERIES.items()
     }
-    
-    return render(request, 'dashboard/analytics.html', context)
 
 
-def get_net_worth_trends(user, start_date, end_date):
-    """Get net worth trends over time"""
-    trends = []
-    current_date = start_date
+def analytics_context(user, embedded_series):
+    """Template context for the analytics page; charts not embedded are fetched from the API"""
+    return {
+        'embedded_series': embedded_series,
+        'recent_activity': get_recent_activity(user),
+    }
+
+
+@login_required
+@use_replica
+def analytics(request):
+    """Analytics page shell; each chart loads its series from the API"""
+    return render(request, 'dashboard/analytics.html', analytics_context(request.user, {}))
+
+
+@use_replica
+async def analytics_async(request):
+    """Analytics page with its series computed concurrently, each under a time limit.
     
-    while current_date <= end_date:
-        month = current_date.month
-        year = current_date.year
-        
-        # Calculate net worth for this month
-        accounts = Account.objects.filter(user=user, is_active=True)
-        total_assets = 0
-        total_liabilities = 0
-        
-        for account in accounts:
-            balance = account.get_latest_balance(month, year)
-            if account.account_type in ['loan', 'credit']:
-                total_liabilities += abs(balance)
-            else:
-                total_assets += balance
-        
-        net_worth = total_assets - total_liabilities
-        
-        trends.append({
-            'date': current_date.strftime('%Y-%m'),
-            'net_worth': float(net_worth),
-            'assets': float(total_assets),
-            'liabilities': float(total_liabilities)
-        })
-        
-        # Move to next month
-        if current_date.month == 12:
-            current_date = current_date.replace(year=current_date.year + 1, month=1)
-        else:
-            current_date = current_date.replace(month=current_date.month + 1)
+    Series that finish within ANALYTICS_SERIES_TIMEOUT are embedded in the
+    page; the rest are fetched from the API like on the plain page. Serve it
+    from backend.asgi for the best results; under WSGI Django runs it in a
+    per-request event loop, which still overlaps the series.
+    """
+    # login_required cannot wrap async views before Django 5.1
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return redirect_to_login(request.get_full_path())
     
-    return trends
+    user = request.user
+    # One portfolio for every series, so accounts are read once across the threads
+    calls = default_series_calls(Portfolio(user))
+    series, _ = await gather_with_timeouts(calls, django_settings.ANALYTICS_SERIES_TIMEOUT)
+    context = analytics_context(user, series)
+    return await sync_to_async(render)(request, 'dashboard/analytics.html', context)
+
+
+@cached_analytics
+def get_net_worth_trends(portfolio, start_date, end_date, granularity='month'):
+    """Get net worth trends over time"""
+    return net_worth_series(portfolio.user, start_date, end_date, granularity)
 
 
-def get_asset_allocation(user):
+@cached_analytics
+def get_asset_allocation(portfolio):
     """Get asset allocation breakdown"""
-    accounts = Account.objects.filter(user=user, is_active=True)
-    allocation = {}
-    
-    for account in accounts:
-        balance = account.get_latest_balance()
-        if balance > 0 and account.account_type not in ['loan', 'credit']:
-            asset_type = account.asset_type
-            if asset_type not in allocation:
-                allocation[asset_type] = 0
-            allocation[asset_type] += float(balance)
+    allocation = portfolio.snapshot.allocation
     
     # Convert to chart format
     chart_data = []
-    colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40']
     
     for i, (asset_type, amount) in enumerate(allocation.items()):
         chart_data.append({
             'label': asset_type.replace('_', ' ').title(),
-            'value': amount,
-            'color': colors[i % len(colors)]
+            'value': float(amount),
+            'color': chart_color(i)
         })
     
     return chart_data
 
 
-def get_income_expenses(user, months=6):
-    """Get income vs expenses over time"""
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=months * 30)
-    
-    transactions = Transaction.objects.filter(
-        user=user,
-        date__gte=start_date,
-        date__lte=end_date
-    )
-    
-    monthly_data = {}
-    
-    for transaction in transactions:
-        month_key = transaction.date.strftime('%Y-%m')
-        if month_key not in monthly_data:
-            monthly_data[month_key] = {'income': 0, 'expenses': 0}
-        
-        if transaction.transaction_type == 'income':
-            monthly_data[month_key]['income'] += float(transaction.amount)
-        elif transaction.transaction_type == 'expense':
-            monthly_data[month_key]['expenses'] += float(transaction.amount)
+@cached_analytics
+def get_income_expenses(portfolio, start_date, end_date, granularity='month'):
+    """Get income vs expenses per month, quarter or year"""
+    totals = period_totals(portfolio.user, start_date, end_date, granularity)
     
     # Convert to chart format
     chart_data = {
-        'labels': list(monthly_data.keys()),
-        'income': [monthly_data[month]['income'] for month in monthly_data.keys()],
-        'expenses': [monthly_data[month]['expenses'] for month in monthly_data.keys()]
+        'labels': [row['label'] for row in totals],
+        'income': [float(row['income']) for row in totals],
+        'expenses': [float(row['expenses']) for row in totals]
     }
     
     return chart_data
 
 
-def get_spending_by_category(user, months=6):
+@cached_analytics
+def get_spending_by_category(portfolio, start_date, end_date):
     """Get spending breakdown by category"""
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=months * 30)
-    
-    transactions = Transaction.objects.filter(
-        user=user,
-        transaction_type='expense',
-        date__gte=start_date,
-        date__lte=end_date
-    ).values('category').annotate(total=Sum('amount'))
-    
     chart_data = []
-    colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#FF6384', '#36A2EB']
     
-    for i, item in enumerate(transactions):
+    for category, total in category_totals(portfolio.user, start_date, end_date):
         chart_data.append({
-            'label': item['category'].replace('_', ' ').title(),
-            'value': float(item['total']),
-            'color': colors[i % len(colors)]
+            'label': category.replace('_', ' ').title(),
+            'value': float(total),
+            'color': CATEGORY_COLORS.get(category, OTHER_COLOR)
         })
     
     return chart_data
 
 
-def get_account_performance(user):
+@cached_analytics
+def get_category_breakdown(portfolio, start_date, end_date, granularity='month'):
+    """Get spending per category per period with changes and top merchants"""
+    return category_breakdown(portfolio.user, start_date, end_date, granularity)
+
+
+@cached_analytics
+def get_account_performance(portfolio, start_date, end_date):
     """Get account performance over time"""
-    accounts = Account.objects.filter(user=user, is_active=True)
-    performance_data = []
+    entries = portfolio.history(start_date, end_date)
     
-    for account in accounts:
-        # Get last 6 months of data
-        entries = account.entries.order_by('-year', '-month')[:6]
-        
-        if entries:
-            balances = [float(entry.balance) for entry in entries]
+    performance_data = []
+    for account in portfolio.accounts:
+        if account.id in entries:
+            months, balances = zip(*entries[account.id])
             performance_data.append({
                 'account_name': account.name,
                 'account_type': account.account_type,
-                'balances': balances,
+                'months': list(months),
+                'balances': list(balances),
                 'growth_rate': calculate_growth_rate(balances) if len(balances) > 1 else 0
             })
     
     return performance_data
 
 
-def get_savings_rate(user, months=6):
+@cached_analytics
+def get_savings_rate(portfolio, start_date, end_date):
     """Calculate monthly savings rate"""
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=months * 30)
-    
-    transactions = Transaction.objects.filter(
-        user=user,
-        date__gte=start_date,
-        date__lte=end_date
-    )
-    
-    total_income = sum(float(t.amount) for t in transactions if t.transaction_type == 'income')
-    total_expenses = sum(float(t.amount) for t in transactions if t.transaction_type == 'expense')
+    totals = range_totals(portfolio.user, start_date, end_date)
+    total_income = totals['income']
+    total_expenses = totals['expenses']
+    net_savings = total_income - total_expenses
     
     if total_income > 0:
-        savings_rate = ((total_income - total_expenses) / total_income) * 100
+        savings_rate = float(net_savings / total_income * 100)
     else:
         savings_rate = 0
     
     return {
         'savings_rate': round(savings_rate, 2),
-        'total_income': total_income,
-        'total_expenses': total_expenses,
-        'net_savings': total_income - total_expenses
+        'total_income': float(total_income),
+        'total_expenses': float(total_expenses),
+        'net_savings': float(net_savings)
     }
 
 
-def get_financial_ratios(user):
+@cached_analytics
+def get_financial_ratios(portfolio):
     """Calculate key financial ratios"""
-    accounts = Account.objects.filter(user=user, is_active=True)
-    
-    total_assets = 0
-    total_liabilities = 0
-    liquid_assets = 0
-    monthly_expenses = 0
-    
-    for account in accounts:
-        balance = account.get_latest_balance()
-        if account.account_type in ['loan', 'credit']:
-            total_liabilities += abs(balance)
-        else:
-            total_assets += balance
-            if account.account_type in ['checking', 'savings']:
-                liquid_assets += balance
+    snapshot = portfolio.snapshot
     
-    # Calculate monthly expenses (last 3 months average)
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=90)
+    total_assets = float(snapshot.total_assets)
+    total_liabilities = float(snapshot.total_liabilities)
+    liquid_assets = float(snapshot.liquid_assets)
     
-    recent_expenses = Transaction.objects.filter(
-        user=user,
-        transaction_type='expense',
-        date__gte=start_date,
-        date__lte=end_date
-    )
-    
-    if recent_expenses:
-        monthly_expenses = float(recent_expenses.aggregate(Sum('amount'))['amount__sum'] or 0) / 3
+    # Average monthly expenses over the last 3 complete calendar months
+    start_date, end_date = calendar_range(timezone.now().date().replace(day=1) - timedelta(days=1), 3)
+    monthly_expenses = float(range_totals(portfolio.user, start_date, end_date)['expenses']) / 3
     
     ratios = {
         'debt_to_income': (total_liabilities / total_assets * 100) if total_assets > 0 else 0,
         'emergency_fund_ratio': (liquid_assets / monthly_expenses) if monthly_expenses > 0 else 0,
         'net_worth': total_assets - total_liabilities,
-        'asset_diversity': len(set(account.asset_type for account in accounts if account.get_latest_balance() > 0))
+        'asset_diversity': snapshot.asset_diversity
     }
     
     return ratios
@@ -351,6 +301,23 @@ def get_recent_activity(user):
     }
 
 
+# Each series the analytics page charts, with the months of history it covers by
+# default (None for point-in-time series, which take no range)
+ANALYTICS_SERIES = {
+    'net-worth-trends': (get_net_worth_trends, 12),
+    'asset-allocation': (get_asset_allocation, None),
+    'income-expenses': (get_income_expenses, 6),
+    'spending-by-category': (get_spending_by_category, 6),
+    'category-breakdown': (get_category_breakdown, 6),
+    'account-performance': (get_account_performance, 6),
+    'savings-rate': (get_savings_rate, 6),
+    'financial-ratios': (get_financial_ratios, None),
+}
+
+# Series that can also be grouped by quarter or year
+GRANULAR_SERIES = {'net-worth-trends', 'income-expenses', 'category-breakdown'}
+
+
 def calculate_growth_rate(balances):
     """Calculate growth rate from balance history"""
     if len(balances) < 2:
@@ -379,38 +346,180 @@ def get_account_color(account_type):
 
 
 @login_required
+@use_replica
 def accounts_list(request):
     """List all user accounts"""
     accounts = Account.objects.filter(user=request.user, is_active=True)
-    return render(request, 'dashboard/accounts_list.html', {'accounts': accounts})
+    # The template calls this only when its cached fragment is missing
+    return render(request, 'dashboard/accounts_list.html', {'accounts': lambda: with_stats(accounts)})
+
+
+@login_required
+def month_close(request):
+    """Record every account's balance for one month in a single submission"""
+    accounts = with_stats(Account.objects.filter(user=request.user, is_active=True).order_by('name'))
+    
+    if request.method == 'POST':
+        form = MonthCloseForm(accounts, request.POST)
+        if form.is_valid():
+            year, month = form.cleaned_data['year'], form.cleaned_data['month']
+            saved = close_month(request.user, year, month, form.balances())
+            messages.success(request, f'Saved {saved} balance{"s" if saved != 1 else ""} for {month:02d}/{year}.')
+            return redirect('dashboard:accounts_list')
+        year, month = form.data.get('year'), form.data.get('month')
+    else:
+        today = timezone.now().date()
+        try:
+            period = datetime.strptime(request.GET.get('period', ''), '%Y-%m').date()
+        except ValueError:
+            period = today
+        year, month = period.year, period.month
+        
+        # Start from the balances already recorded for the month
+        initial = {'year': year, 'month': month}
+        for account_id, balance in AccountEntry.objects.filter(
+            account__in=[account.pk for account in accounts], year=year, month=month
+        ).values_list('account_id', 'balance'):
+            initial[f'balance_{account_id}'] = balance
+        form = MonthCloseForm(accounts, initial=initial)
+    
+    return render(request, 'dashboard/month_close.html', {'form': form, 'year': year, 'month': month})
+
+
+def query_without(request, *keys):
+    """The request's query string minus the given parameters"""
+    query = request.GET.copy()
+    for key in keys:
+        query.pop(key, None)
+    return query.urlencode()
 
 
 @login_required
 def account_detail(request, account_id):
     """Show account details"""
     account = get_object_or_404(Account, id=account_id, user=request.user)
-    entries = account.entries.order_by('-year', '-month')
-    transactions = account.transactions.order_by('-date')
+    
+    try:
+        entries = KeysetPaginator(account.entries.all(), ('year', 'month'), per_page=24).page(
+            after=request.GET.get('entries_after'), before=request.GET.get('entries_before')
+        )
+        transactions = KeysetPaginator(account.transactions.all(), TRANSACTION_PAGE_KEYS).page(
+            after=request.GET.get('after'), before=request.GET.get('before')
+        )
+    except InvalidCursor as exc:
+        raise Http404(str(exc))
     
     context = {
         'account': account,
         'entries': entries,
-        'transactions': transactions
+        'transactions': transactions,
+        'entry_count': account.entries.count(),
+        'transaction_count': account.transactions.count(),
+        'entries_query': query_without(request, 'entries_after', 'entries_before'),
+        'transactions_query': query_without(request, 'after', 'before'),
     }
     return render(request, 'dashboard/account_detail.html', context)
 
 
 @login_required
+@use_replica
 def transactions_list(request):
     """List all user transactions"""
-    transactions = Transaction.objects.filter(user=request.user).order_by('-date')
-    return render(request, 'dashboard/transactions_list.html', {'transactions': transactions})
+    transactions = Transaction.objects.filter(user=request.user).select_related('account')
+    
+    form = TransactionFilterForm(request.user, request.GET or None)
+    if form.is_valid():
+        transactions = form.filter(transactions)
+    
+    try:
+        page = KeysetPaginator(transactions, TRANSACTION_PAGE_KEYS).page(
+            after=request.GET.get('after'), before=request.GET.get('before')
+        )
+    except InvalidCursor as exc:
+        raise Http404(str(exc))
+    
+    context = {
+        'transactions': page,
+        'form': form,
+        # Keep the filters when following the page cursors
+        'page_query': query_without(request, 'after', 'before'),
+    }
+    return render(request, 'dashboard/transactions_list.html', context)
+
+
+@login_required
+def import_transactions(request):
+    """Upload a CSV or OFX/QFX statement into one of the user's accounts"""
+    form = TransactionImportForm(request.user, request.POST or None, request.FILES or None)
+    
+    if request.method == 'POST' and form.is_valid():
+        upload = form.cleaned_data['file']
+        if upload.size > django_settings.IMPORT_INLINE_MAX_BYTES:
+            job = enqueue(
+                request.user,
+                'import_transactions',
+                {'account_id': form.cleaned_data['account'].pk, 'file_format': form.cleaned_data['file_format']},
+                input_file=upload,
+            )
+            messages.info(request, 'This file is large, so it is being imported in the background.')
+            return redirect('dashboard:job_detail', job_id=job.pk)
+        
+        importer = TransactionImporter(form.cleaned_data['account'])
+        try:
+            result = importer.run(open_text(form.cleaned_data['file'].file), form.cleaned_data['file_format'])
+        except ImportFormatError as exc:
+            form.add_error('file', str(exc))
+        else:
+            messages.success(request, f'Import complete: {result}')
+            return redirect('dashboard:transactions_list')
+    
+    return render(request, 'dashboard/import_transactions.html', {'form': form})
+
+
+@login_required
+@use_replica
+def export_data(request, dataset, file_format):
+    """Download transactions, account entries or net worth history as CSV, Excel or PDF"""
+    if dataset not in EXPORT_DATASETS or file_format not in EXPORT_FORMATS:
+        raise Http404('Unknown export')
+    
+    export = EXPORT_DATASETS[dataset](request.user, request.GET)
+    if export.queryset.count() > django_settings.EXPORT_INLINE_MAX_ROWS:
+        job = enqueue(request.user, 'export', {'dataset': dataset, 'file_format': file_format, 'params': request.GET.dict()})
+        messages.info(request, 'This export is large, so it is being prepared in the background.')
+        return redirect('dashboard:job_detail', job_id=job.pk)
+    
+    return export_response(export, file_format)
+
+
+@login_required
+def job_detail(request, job_id):
+    """Progress page for a background job; polls the job API until it finishes"""
+    job = get_object_or_404(Job, id=job_id, user=request.user)
+    return render(request, 'dashboard/job_detail.html', {'job': job})
+
+
+@login_required
+def job_download(request, job_id):
+    """Download the file produced by a finished export job"""
+    job = get_object_or_404(Job, id=job_id, user=request.user, status='succeeded')
+    if not job.output_file:
+        raise Http404('This job has no file to download')
+    return FileResponse(job.output_file.open('rb'), as_attachment=True, filename=job.result.get('filename'))
 
 
 @login_required
 def settings(request):
     """User settings page"""
-    return render(request, 'dashboard/settings.html')
+    profile = Profile.objects.filter(user=request.user).first() or Profile(user=request.user)
+    form = ProfileForm(request.POST or None, instance=profile)
+    
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, f"Totals are now shown in {form.cleaned_data['base_currency']}.")
+        return redirect('dashboard:settings')
+    
+    return render(request, 'dashboard/settings.html', {'form': form})
 
 
 def terms_of_service(request):
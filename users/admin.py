@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Profile
+
+
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = ['user', 'base_currency', 'updated_at']
+    list_filter = ['base_currency']
+    search_fields = ['user__username', 'user__email']